@@ -6,6 +6,7 @@ Deploys central monitoring infrastructure:
 - EventBridge event bus
 - Simple routing Lambda
 - Pattern detection Lambda (with Bedrock)
+- Alert digester Lambda (batches critical alerts into email digests)
 - DynamoDB investigation tracker
 - CloudWatch dashboards
 """
@@ -20,6 +21,7 @@ from aws_cdk import (
     aws_events,
     aws_events_targets,
     aws_lambda,
+    aws_lambda_event_sources,
     aws_dynamodb,
     aws_iam,
     aws_logs,
@@ -35,6 +37,29 @@ organization_id = os.getenv("ORGANIZATION_ID", "o-s9voqnp6ge")
 environment_name = os.getenv("ENVIRONMENT", "dev")
 central_account_id = os.getenv("CENTRAL_ACCOUNT_ID", "891377308600")
 
+# CloudWatch Logs only accepts specific retention periods
+LOG_RETENTION_BY_DAYS = {
+    1: aws_logs.RetentionDays.ONE_DAY,
+    3: aws_logs.RetentionDays.THREE_DAYS,
+    5: aws_logs.RetentionDays.FIVE_DAYS,
+    7: aws_logs.RetentionDays.ONE_WEEK,
+    14: aws_logs.RetentionDays.TWO_WEEKS,
+    30: aws_logs.RetentionDays.ONE_MONTH,
+    60: aws_logs.RetentionDays.TWO_MONTHS,
+    90: aws_logs.RetentionDays.THREE_MONTHS,
+    180: aws_logs.RetentionDays.SIX_MONTHS,
+    365: aws_logs.RetentionDays.ONE_YEAR,
+}
+
+# Investigation table GSI migration. CloudFormation allows one GSI create/delete per
+# table update, so existing tables step through --context tableIndexStage=1,2,...;
+# each stage makes exactly one index change (see README "Upgrading the investigation table")
+TABLE_INDEX_STAGE_ADD_CLIENT_SEVERITY = 1
+TABLE_INDEX_STAGE_ADD_ENVIRONMENT_TIME = 2
+TABLE_INDEX_STAGE_DROP_SEVERITY = 3
+TABLE_INDEX_STAGE_DROP_CLIENT_ACCOUNT = 4
+TABLE_INDEX_FINAL_STAGE = TABLE_INDEX_STAGE_DROP_CLIENT_ACCOUNT
+
 class CentralMonitoringStack(Stack):
     """Central account infrastructure for multi-client investigation monitoring"""
 
@@ -44,6 +69,20 @@ class CentralMonitoringStack(Stack):
         account = Stack.of(self).account
         region = Stack.of(self).region
 
+        # Retention knobs (override with --context logRetentionDays=30 etc.)
+        log_retention_days = int(self.node.try_get_context("logRetentionDays") or 14)
+        if log_retention_days not in LOG_RETENTION_BY_DAYS:
+            raise ValueError(f"logRetentionDays must be one of {sorted(LOG_RETENTION_BY_DAYS)}")
+        log_retention = LOG_RETENTION_BY_DAYS[log_retention_days]
+        archive_retention_days = int(self.node.try_get_context("archiveRetentionDays") or 14)
+
+        # Routing Lambda memory (CPU scales with memory; tune with Lambda Power Tuning results)
+        simple_routing_memory_mb = int(self.node.try_get_context("simpleRoutingMemoryMb") or 1024)
+        # Longest an event waits in the routing queue for its batch to fill. This delays
+        # CRITICAL pages too, so keep it short; under load batches fill without waiting
+        routing_batch_window_context = self.node.try_get_context("routingBatchWindowSeconds")
+        routing_batch_window_seconds = 5 if routing_batch_window_context is None else int(routing_batch_window_context)
+
         # EventBridge event bus for client events
         event_bus = aws_events.EventBus(self,"ClientInvestigationsEventBus",
             event_bus_name=f"client-investigations-{environment_name}",
@@ -66,19 +105,26 @@ class CentralMonitoringStack(Stack):
             )
         )
 
-        # # Archive for replay/debugging (90 day retention)
+        # # Archive for replay/debugging (14 day retention by default)
         aws_events.Archive(
             self,
             "InvestigationEventsArchive",
             archive_name=f"investigation-events-{environment_name}",
             source_event_bus=event_bus,
             description="Archive of all investigation events for replay/debugging",
-            retention=Duration.days(14),
+            retention=Duration.days(archive_retention_days),
             event_pattern=aws_events.EventPattern(
                 source=["devops.investigation"]
             )
         )
 
+        # # Stream change notifications only; opt in to full images via context if a consumer needs them
+        stream_view_type = (
+            aws_dynamodb.StreamViewType.NEW_AND_OLD_IMAGES
+            if self.node.try_get_context("streamOldImages")
+            else aws_dynamodb.StreamViewType.KEYS_ONLY
+        )
+
         # # DynamoDB table for investigation tracking
         investigations_table = aws_dynamodb.Table(self,"InvestigationTrackerTable",
             table_name=f"investigation-tracker-{environment_name}",
@@ -93,86 +139,195 @@ class CentralMonitoringStack(Stack):
             billing_mode=aws_dynamodb.BillingMode.PAY_PER_REQUEST,
             removal_policy=RemovalPolicy.RETAIN,
             point_in_time_recovery=True,
-            stream=aws_dynamodb.StreamViewType.NEW_AND_OLD_IMAGES,
+            stream=stream_view_type,
+            time_to_live_attribute="ttl",
         )
 
-        # # GSI for querying by client account
+        # # GSI migration stage - new tables go straight to the final layout
+        table_index_stage = int(self.node.try_get_context("tableIndexStage") or TABLE_INDEX_FINAL_STAGE)
+        if not 1 <= table_index_stage <= TABLE_INDEX_FINAL_STAGE:
+            raise ValueError(f"tableIndexStage must be between 1 and {TABLE_INDEX_FINAL_STAGE}")
+
+        # # Legacy GSIs, kept until their migration stage removes them
+        if table_index_stage < TABLE_INDEX_STAGE_DROP_CLIENT_ACCOUNT:
+            investigations_table.add_global_secondary_index(
+                index_name="ClientAccountIndex",
+                partition_key=aws_dynamodb.Attribute(
+                    name="client_account_id",
+                    type=aws_dynamodb.AttributeType.STRING
+                ),
+                sort_key=aws_dynamodb.Attribute(
+                    name="timestamp",
+                    type=aws_dynamodb.AttributeType.STRING
+                )
+            )
+        if table_index_stage < TABLE_INDEX_STAGE_DROP_SEVERITY:
+            investigations_table.add_global_secondary_index(
+                index_name="SeverityIndex",
+                partition_key=aws_dynamodb.Attribute(
+                    name="severity",
+                    type=aws_dynamodb.AttributeType.STRING
+                ),
+                sort_key=aws_dynamodb.Attribute(
+                    name="timestamp",
+                    type=aws_dynamodb.AttributeType.STRING
+                )
+            )
+
+        # # GSI for querying by client account, optionally narrowed by severity
+        # # Sort key is "SEVERITY#timestamp", e.g. begins_with(severity_ts, "CRITICAL#")
         investigations_table.add_global_secondary_index(
-            index_name="ClientAccountIndex",
+            index_name="ClientSeverityIndex",
             partition_key=aws_dynamodb.Attribute(
                 name="client_account_id",
                 type=aws_dynamodb.AttributeType.STRING
             ),
             sort_key=aws_dynamodb.Attribute(
-                name="timestamp",
+                name="severity_ts",
                 type=aws_dynamodb.AttributeType.STRING
             )
         )
 
-        # # GSI for querying by severity
-        investigations_table.add_global_secondary_index(
-            index_name="SeverityIndex",
-            partition_key=aws_dynamodb.Attribute(
-                name="severity",
-                type=aws_dynamodb.AttributeType.STRING
-            ),
-            sort_key=aws_dynamodb.Attribute(
-                name="timestamp",
-                type=aws_dynamodb.AttributeType.STRING
+        # # GSI for time-range queries (pattern detection reads the last 24h per environment)
+        if table_index_stage >= TABLE_INDEX_STAGE_ADD_ENVIRONMENT_TIME:
+            investigations_table.add_global_secondary_index(
+                index_name="EnvironmentTimeIndex",
+                partition_key=aws_dynamodb.Attribute(
+                    name="environment",
+                    type=aws_dynamodb.AttributeType.STRING
+                ),
+                sort_key=aws_dynamodb.Attribute(
+                    name="timestamp",
+                    type=aws_dynamodb.AttributeType.STRING
+                ),
+                projection_type=aws_dynamodb.ProjectionType.INCLUDE,
+                non_key_attributes=["client_name", "severity", "summary"]
             )
+
+        # # SNS topic for critical alerts (published by simple routing Lambda only)
+        alert_topic = aws_sns.Topic(
+            self,
+            "CriticalAlertTopic",
+            topic_name=f"investigation-critical-alerts-{environment_name}",
+            display_name="Critical Investigation Alerts"
         )
 
-        # # SNS topic for critical alerts
-        # alert_topic = aws_sns.Topic(
-        #     self,
-        #     "CriticalAlertTopic",
-        #     topic_name=f"investigation-critical-alerts-{environment_name}",
-        #     display_name="Critical Investigation Alerts"
-        # )
+        # # Deliver alerts by email if provided via context
+        alert_email = self.node.try_get_context("alertEmail")
+        if alert_email and self.node.try_get_context("criticalPagerBypass"):
+            # Escape hatch: one email per alert, straight from SNS
+            alert_topic.add_subscription(
+                aws_sns_subscriptions.EmailSubscription(alert_email)
+            )
+        elif alert_email:
+            # Default: SNS → SQS → digester Lambda, one SES email per 30s batch
+            # Alerts that keep failing (e.g. unverified SES sender) land in the DLQ
+            # instead of silently expiring from the digest queue
+            alert_digest_dlq = aws_sqs.Queue(
+                self,
+                "AlertDigestDLQ",
+                queue_name=f"investigation-alert-digest-dlq-{environment_name}",
+                retention_period=Duration.days(14)
+            )
+            alert_digest_queue = aws_sqs.Queue(
+                self,
+                "AlertDigestQueue",
+                queue_name=f"investigation-alert-digest-{environment_name}",
+                retention_period=Duration.days(4),
+                visibility_timeout=Duration.minutes(3),
+                dead_letter_queue=aws_sqs.DeadLetterQueue(max_receive_count=3, queue=alert_digest_dlq)
+            )
+            alert_topic.add_subscription(
+                aws_sns_subscriptions.SqsSubscription(alert_digest_queue)
+            )
 
-        # # # Add email subscription if provided via context
-        # # alert_email = self.node.try_get_context("alertEmail")
-        # # if alert_email:
-        # #     alert_topic.add_subscription(
-        # #         aws_sns_subscriptions.EmailSubscription(alert_email)
-        # #     )
+            alert_digester_lambda = aws_lambda.Function(self,"AlertDigesterLambda",
+                function_name=f"investigation-alert-digester-{environment_name}",
+                description="Coalesces critical alerts into a single email digest",
+                runtime=aws_lambda.Runtime.PYTHON_3_11,
+                architecture=aws_lambda.Architecture.ARM_64,
+                handler="index.handler",
+                code=aws_lambda.Code.from_asset("../lambda/alert_digester"),
+                timeout=Duration.seconds(30),
+                memory_size=256,
+                environment={
+                    "ALERT_EMAIL": alert_email,
+                    "SENDER_EMAIL": self.node.try_get_context("alertSenderEmail") or alert_email,
+                    "ENVIRONMENT": environment_name,
+                },
+                log_retention=log_retention,
+            )
+            alert_digester_lambda.add_event_source(
+                aws_lambda_event_sources.SqsEventSource(
+                    alert_digest_queue,
+                    batch_size=100,
+                    max_batching_window=Duration.seconds(30),
+                    report_batch_item_failures=True
+                )
+            )
+            alert_digester_lambda.add_to_role_policy(
+                aws_iam.PolicyStatement(
+                    effect=aws_iam.Effect.ALLOW,
+                    actions=["ses:SendEmail"],
+                    resources=[f"arn:aws:ses:{region}:{account}:identity/*"]
+                )
+            )
 
         # # Simple routing Lambda (90% of events)
         simple_routing_lambda = aws_lambda.Function(self,"SimpleRoutingLambda",
             function_name=f"investigation-simple-routing-{environment_name}",
             description="Routes investigation events based on severity",
             runtime=aws_lambda.Runtime.PYTHON_3_11,
+            architecture=aws_lambda.Architecture.ARM_64,
             handler="index.handler",
             code=aws_lambda.Code.from_asset("../lambda/simple_routing"),
             timeout=Duration.seconds(30),
-            memory_size=256,
+            memory_size=simple_routing_memory_mb,
             environment={
                 "INVESTIGATIONS_TABLE": investigations_table.table_name,
-                # "ALERT_TOPIC_ARN": alert_topic.topic_arn,
+                "ALERT_TOPIC_ARN": alert_topic.topic_arn,
                 "ENVIRONMENT": environment_name,
             },
-            log_retention=aws_logs.RetentionDays.ONE_MONTH,
+            log_retention=log_retention,
         )
 
+        # # Live alias with provisioned concurrency to keep the hot-path Lambda warm
+        simple_routing_alias = aws_lambda.Alias(self, "SimpleRoutingLiveAlias",
+            alias_name="live",
+            version=simple_routing_lambda.current_version,
+            provisioned_concurrent_executions=2,
+        )
+        simple_routing_alias.add_auto_scaling(
+            min_capacity=2,
+            max_capacity=20
+        ).scale_on_utilization(utilization_target=0.7)
+
         # # Grant permissions for simple routing Lambda
         investigations_table.grant_write_data(simple_routing_lambda)
 
-        # alert_topic.grant_publish(simple_routing_lambda)
+        alert_topic.grant_publish(simple_routing_lambda)
         # simple_routing_lambda.add_to_role_policy(
         #     aws_iam.PolicyStatement(
         #         effect=aws_iam.Effect.ALLOW,
-        #         actions=[
-        #             "secretsmanager:GetSecretValue",
-        #             "xray:PutTraceSegments",
-        #             "xray:PutTelemetryRecords"
-        #         ],
+        #         actions=["secretsmanager:GetSecretValue"],
         #         resources=[
         #             f"arn:aws:secretsmanager:{region}:{account}:secret:pagerduty/*",
-        #             f"arn:aws:secretsmanager:{region}:{account}:secret:jira/*",
-        #             "*"  # X-Ray
+        #             f"arn:aws:secretsmanager:{region}:{account}:secret:jira/*"
         #         ]
         #     )
         # )
+        # simple_routing_lambda.role.add_managed_policy(
+        #     aws_iam.ManagedPolicy.from_aws_managed_policy_name("AWSXRayDaemonWriteAccess")
+        # )
+
+        # # Bedrock model ID, resolved at runtime so models can be swapped without a redeploy
+        # bedrock_model_param = aws_ssm.StringParameter(
+        #     self,
+        #     "BedrockModelIdParameter",
+        #     parameter_name="/investigation-orchestrator/bedrock-model-id",
+        #     string_value="anthropic.claude-sonnet-4-20250514",
+        #     description="Bedrock model used by pattern detection"
+        # )
 
         # # Pattern detection Lambda (10% of events, uses Bedrock)
         # pattern_detection_lambda = aws_lambda.Function(
@@ -181,6 +336,7 @@ class CentralMonitoringStack(Stack):
         #     function_name=f"investigation-pattern-detection-{environment_name}",
         #     description="Analyzes patterns across investigations using Bedrock Agent",
         #     runtime=aws_lambda.Runtime.PYTHON_3_11,
+        #     architecture=aws_lambda.Architecture.ARM_64,
         #     handler="index.handler",
         #     code=aws_lambda.Code.from_asset("../lambda/pattern_detector"),
         #     timeout=Duration.seconds(300),
@@ -188,93 +344,96 @@ class CentralMonitoringStack(Stack):
         #     environment={
         #         "INVESTIGATIONS_TABLE": investigations_table.table_name,
         #         "ALERT_TOPIC_ARN": alert_topic.topic_arn,
-        #         "BEDROCK_MODEL_ID": "anthropic.claude-sonnet-4-20250514",
+        #         "BEDROCK_MODEL_PARAM": bedrock_model_param.parameter_name,
         #         "ENVIRONMENT": environment_name,
         #     },
         #     tracing=aws_lambda.Tracing.ACTIVE,
-        #     log_retention=aws_logs.RetentionDays.ONE_MONTH,
+        #     log_retention=log_retention,
         # )
 
         # # Grant permissions for pattern detection Lambda
         # investigations_table.grant_read_write_data(pattern_detection_lambda)
         # alert_topic.grant_publish(pattern_detection_lambda)
+        # bedrock_model_param.grant_read(pattern_detection_lambda)
         # pattern_detection_lambda.add_to_role_policy(
         #     aws_iam.PolicyStatement(
         #         effect=aws_iam.Effect.ALLOW,
         #         actions=[
         #             "bedrock:InvokeModel",
-        #             "bedrock:InvokeModelWithResponseStream",
-        #             "xray:PutTraceSegments",
-        #             "xray:PutTelemetryRecords"
+        #             "bedrock:InvokeModelWithResponseStream"
         #         ],
         #         resources=[
-        #             f"arn:aws:bedrock:{region}::foundation-model/anthropic.claude-sonnet-4-20250514",
-        #             "*"  # X-Ray
+        #             f"arn:aws:bedrock:{region}::foundation-model/anthropic.claude-*"
         #         ]
         #     )
         # )
+        # pattern_detection_lambda.role.add_managed_policy(
+        #     aws_iam.ManagedPolicy.from_aws_managed_policy_name("AWSXRayDaemonWriteAccess")
+        # )
 
-        # # EventBridge rules for routing
-        
-        # # Rule 1: High/Critical severity → Simple routing + SNS
-        high_severity_rule = aws_events.Rule(self, "HighSeverityRule",
-            rule_name=f"investigation-high-severity-{environment_name}",
-            description="Routes HIGH/CRITICAL investigations to simple routing and alerts",
-            event_bus=event_bus,
-            event_pattern=aws_events.EventPattern(
-                source=["devops.investigation"],
-                detail_type=["InvestigationCompleted"],
-                detail={
-                    "severity": ["CRITICAL", "HIGH"]
-                }
+        # # SQS DLQ for failed EventBridge deliveries and routing messages that keep failing
+        dlq = aws_sqs.Queue(
+            self,
+            "EventBridgeDLQ",
+            queue_name=f"investigation-events-dlq-{environment_name}",
+            retention_period=Duration.days(14),
+            visibility_timeout=Duration.minutes(5)
+        )
+
+        # # Routing queue - EventBridge → SQS → simple routing, so one invocation handles
+        # # up to 10 events with batched DynamoDB writes and SNS publishes
+        routing_queue = aws_sqs.Queue(
+            self,
+            "SimpleRoutingQueue",
+            queue_name=f"investigation-routing-{environment_name}",
+            retention_period=Duration.days(4),
+            # # At least 6x the Lambda timeout, per the SQS event source guidance
+            visibility_timeout=Duration.minutes(3),
+            dead_letter_queue=aws_sqs.DeadLetterQueue(max_receive_count=3, queue=dlq)
+        )
+        simple_routing_alias.add_event_source(
+            aws_lambda_event_sources.SqsEventSource(
+                routing_queue,
+                batch_size=10,
+                max_batching_window=Duration.seconds(routing_batch_window_seconds),
+                # # The handler returns batchItemFailures, so a failed message doesn't
+                # # re-page every investigation that succeeded alongside it
+                report_batch_item_failures=True
             )
         )
-        # high_severity_rule.add_target(aws_events_targets.SnsTopic(alert_topic))
 
-        # # Rule 2: Medium severity → Simple routing only
-        medium_severity_rule = aws_events.Rule(self,"MediumSeverityRule",
-            rule_name=f"investigation-medium-severity-{environment_name}",
-            description="Routes MEDIUM investigations to simple routing",
+        # # EventBridge rules for routing
+
+        # # Rule 1: Actionable events → Simple routing queue (severity decided in Lambda) + Pattern detection
+        # # Non-actionable severities are dropped here so they never cost a Lambda invocation
+        all_investigations_rule = aws_events.Rule(self, "AllInvestigationsRule",
+            rule_name=f"investigation-all-{environment_name}",
+            description="Routes actionable investigations to simple routing and pattern detection",
             event_bus=event_bus,
             event_pattern=aws_events.EventPattern(
                 source=["devops.investigation"],
                 detail_type=["InvestigationCompleted"],
                 detail={
-                    "severity": ["MEDIUM"]
+                    "severity": ["CRITICAL", "HIGH", "MEDIUM"]
                 }
-            )
-        )
-
-
-        # # Rule 3: All events → Pattern detection (for analysis)
-        # pattern_detection_rule = aws_events.Rule(
-        #     self,
-        #     "PatternDetectionRule",
-        #     rule_name=f"investigation-pattern-detection-{environment_name}",
-        #     description="Sends all investigations to pattern detection for correlation",
-        #     event_bus=event_bus,
-        #     event_pattern=aws_events.EventPattern(
-        #         source=["devops.investigation"],
-        #         detail_type=["InvestigationCompleted"]
-        #     )
-        # )
-        # pattern_detection_rule.add_target(aws_events_targets.LambdaFunction(pattern_detection_lambda))
-
-        # # SQS DLQ for failed EventBridge invocations
-        dlq = aws_sqs.Queue(
-            self,
-            "EventBridgeDLQ",
-            queue_name=f"investigation-events-dlq-{environment_name}",
-            retention_period=Duration.days(14),
-            visibility_timeout=Duration.minutes(5)
+            ),
+            # # Retries capped at 2 / 30 min (default is 185 / 24h), then the event goes to the DLQ
+            targets=[
+                aws_events_targets.SqsQueue(routing_queue,
+                    dead_letter_queue=dlq,
+                    retry_attempts=2,
+                    max_event_age=Duration.minutes(30)
+                ),
+                # aws_events_targets.LambdaFunction(pattern_detection_lambda,
+                #     dead_letter_queue=dlq,
+                #     retry_attempts=2,
+                #     max_event_age=Duration.minutes(30)
+                # ),
+            ]
         )
 
-        medium_severity_rule.add_target(aws_events_targets.LambdaFunction(simple_routing_lambda, dead_letter_queue=dlq))
-        
-        # # Add DLQ to high severity rule
-        high_severity_rule.add_target(
-            aws_events_targets.LambdaFunction(simple_routing_lambda, dead_letter_queue=dlq)
-        )
+        # # HIGH/CRITICAL alerts are published to SNS by the simple routing Lambda,
+        # # so there is no separate bus-level SNS rule (avoids duplicate alerts)
 
         # # CloudWatch dashboard
         # dashboard = aws_cloudwatch.Dashboard(
@@ -283,8 +442,9 @@ class CentralMonitoringStack(Stack):
         #     dashboard_name=f"InvestigationOrchestrator-{environment_name}"
         # )
 
-        # # EventBridge metrics
-        # dashboard.add_widgets(
+        # # Dashboard widgets, packed into a single row (3 x width 8 = 24 columns)
+        # dashboard_widgets = [
+        #     # EventBridge metrics
         #     aws_cloudwatch.GraphWidget(
         #         title="EventBridge Events",
         #         left=[
@@ -295,33 +455,28 @@ class CentralMonitoringStack(Stack):
         #                 dimensions_map={"EventBusName": event_bus.event_bus_name}
         #             )
         #         ],
-        #         width=12
-        #     )
-        # )
-
-        # # Lambda metrics
-        # dashboard.add_widgets(
+        #         width=8
+        #     ),
+        #     # Lambda metrics
         #     aws_cloudwatch.GraphWidget(
         #         title="Lambda Invocations",
         #         left=[
         #             simple_routing_lambda.metric_invocations(),
         #             pattern_detection_lambda.metric_invocations()
         #         ],
-        #         width=12
-        #     )
-        # )
-
-        # # DynamoDB metrics
-        # dashboard.add_widgets(
+        #         width=8
+        #     ),
+        #     # DynamoDB metrics
         #     aws_cloudwatch.GraphWidget(
         #         title="DynamoDB Operations",
         #         left=[
         #             investigations_table.metric_consumed_write_capacity_units(),
         #             investigations_table.metric_consumed_read_capacity_units()
         #         ],
-        #         width=12
-        #     )
-        # )
+        #         width=8
+        #     ),
+        # ]
+        # dashboard.add_widgets(*dashboard_widgets)
 
         # # CloudWatch alarms
         
@@ -3,11 +3,15 @@
 Investigation Orchestrator - Client Account
 
 Deploys client-side infrastructure:
-- Investigation monitor Lambda (polls DevOps Agent, formats, and sends to central)
-- EventBridge schedule (triggers monitor every 5 min)
+- Investigation monitor Lambda (formats DevOps Agent investigations and queues for central)
+- CloudWatch Logs subscription (pushes completed investigations to the monitor)
+- SQS outbox queue + EventBridge Pipe (batches events to the central event bus)
+- EventBridge schedule (hourly reconciliation poll as a safety net)
 - IAM roles for cross-account access
 """
 
+import functools
+import json
 import os
 import yaml
 from aws_cdk import (
@@ -20,9 +24,43 @@ from aws_cdk import (
     aws_events,
     aws_events_targets,
     aws_logs,
+    aws_logs_destinations,
+    aws_pipes,
+    aws_sqs,
 )
 from constructs import Construct
 
+# libyaml-backed loader when available (much faster than the pure-Python one)
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+# CloudWatch Logs only accepts specific retention periods
+LOG_RETENTION_BY_DAYS = {
+    1: aws_logs.RetentionDays.ONE_DAY,
+    3: aws_logs.RetentionDays.THREE_DAYS,
+    5: aws_logs.RetentionDays.FIVE_DAYS,
+    7: aws_logs.RetentionDays.ONE_WEEK,
+    14: aws_logs.RetentionDays.TWO_WEEKS,
+    30: aws_logs.RetentionDays.ONE_MONTH,
+    60: aws_logs.RetentionDays.TWO_MONTHS,
+    90: aws_logs.RetentionDays.THREE_MONTHS,
+    180: aws_logs.RetentionDays.SIX_MONTHS,
+    365: aws_logs.RetentionDays.ONE_YEAR,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _load_yaml(path: str, mtime: float) -> dict:
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=YamlLoader)
+
+
+def load_client_config(path: str) -> dict:
+    """Load a client YAML config, re-parsing only when the file has changed"""
+    return _load_yaml(path, os.path.getmtime(path))
+
 
 class ClientInvestigationStack(Stack):
     """Client account infrastructure for investigation monitoring"""
@@ -43,14 +81,44 @@ class ClientInvestigationStack(Stack):
 
         central_event_bus_arn = client_config["central_event_bus_arn"]
         devops_agent_config = client_config["devops_agent"]
+        client_slug = client_name.lower().replace(' ', '-')
+        agent_region = devops_agent_config.get("region", "us-east-1")
+        state_parameter_prefix = f"/investigation-orchestrator/{client_name}"
+
+        # Retention knobs (override with --context logRetentionDays=30 etc.)
+        log_retention_days = int(self.node.try_get_context("logRetentionDays") or 14)
+        if log_retention_days not in LOG_RETENTION_BY_DAYS:
+            raise ValueError(f"logRetentionDays must be one of {sorted(LOG_RETENTION_BY_DAYS)}")
+        log_retention = LOG_RETENTION_BY_DAYS[log_retention_days]
+
+        # Outbox dead-letter queue - events the Pipe can't deliver (e.g. central bus policy
+        # missing) land here after repeated failures instead of silently expiring
+        outbox_dlq = aws_sqs.Queue(
+            self,
+            "InvestigationOutboxDLQ",
+            queue_name=f"investigation-outbox-dlq-{client_slug}-{environment_name}",
+            retention_period=Duration.days(14)
+        )
+
+        # Outbox queue - the monitor Lambda batches events here, the Pipe forwards them to central
+        outbox_queue = aws_sqs.Queue(
+            self,
+            "InvestigationOutboxQueue",
+            queue_name=f"investigation-outbox-{client_slug}-{environment_name}",
+            retention_period=Duration.days(4),
+            visibility_timeout=Duration.seconds(60),
+            # SQS-sourced pipes use the queue's redrive policy as their DLQ
+            dead_letter_queue=aws_sqs.DeadLetterQueue(max_receive_count=5, queue=outbox_dlq)
+        )
 
         # Investigation monitor Lambda - handles polling + formatting + sending
         investigation_monitor_lambda = aws_lambda.Function(
             self,
             "InvestigationMonitorLambda",
-            function_name=f"investigation-monitor-{client_name.lower().replace(' ', '-')}-{environment_name}",
+            function_name=f"investigation-monitor-{client_slug}-{environment_name}",
             description=f"Monitors DevOps Agent investigations for {client_name} and sends to central account",
             runtime=aws_lambda.Runtime.PYTHON_3_11,
+            architecture=aws_lambda.Architecture.ARM_64,
             handler="index.handler",
             code=aws_lambda.Code.from_asset("../lambda/investigation_monitor"),
             timeout=Duration.seconds(60),
@@ -58,19 +126,28 @@ class ClientInvestigationStack(Stack):
             environment={
                 "CLIENT_NAME": client_name,
                 "CLIENT_ACCOUNT_ID": client_config["client_account_id"],
-                "CENTRAL_EVENT_BUS_ARN": central_event_bus_arn,
+                "OUTBOX_QUEUE_URL": outbox_queue.queue_url,
                 "DEVOPS_AGENT_SPACE_ID": devops_agent_config.get("agent_space_id", ""),
-                "DEVOPS_AGENT_REGION": devops_agent_config.get("region", "us-east-1"),
-                "STATE_PARAMETER_NAME": f"/investigation-orchestrator/{client_name}/last-processed-investigation",
+                "DEVOPS_AGENT_REGION": agent_region,
+                "STATE_PARAMETER_NAME": f"{state_parameter_prefix}/last-processed-investigation",
                 "ENVIRONMENT": environment_name,
-                "TAGS": str(client_config.get("tags", {}))
+                "TAGS": json.dumps(client_config.get("tags", {}))
             },
             tracing=aws_lambda.Tracing.ACTIVE,
-            log_retention=aws_logs.RetentionDays.ONE_MONTH,
+            log_retention=log_retention,
         )
 
-        # Grant permission to send events to central EventBridge
-        investigation_monitor_lambda.add_to_role_policy(
+        # Grant permission to batch events into the outbox queue (covers sqs:SendMessageBatch)
+        outbox_queue.grant_send_messages(investigation_monitor_lambda)
+
+        # Pipe role - consumes the outbox queue and sends events to central EventBridge
+        pipe_role = aws_iam.Role(
+            self,
+            "InvestigationOutboxPipeRole",
+            assumed_by=aws_iam.ServicePrincipal("pipes.amazonaws.com")
+        )
+        outbox_queue.grant_consume_messages(pipe_role)
+        pipe_role.add_to_policy(
             aws_iam.PolicyStatement(
                 effect=aws_iam.Effect.ALLOW,
                 actions=["events:PutEvents"],
@@ -78,6 +155,31 @@ class ClientInvestigationStack(Stack):
             )
         )
 
+        # EventBridge Pipe - SQS outbox → central event bus, up to 10 events per PutEvents
+        aws_pipes.CfnPipe(
+            self,
+            "InvestigationOutboxPipe",
+            name=f"investigation-outbox-{client_slug}-{environment_name}",
+            description=f"Forwards {client_name} investigation events to the central event bus",
+            role_arn=pipe_role.role_arn,
+            source=outbox_queue.queue_arn,
+            source_parameters=aws_pipes.CfnPipe.PipeSourceParametersProperty(
+                sqs_queue_parameters=aws_pipes.CfnPipe.PipeSourceSqsQueueParametersProperty(
+                    batch_size=10,
+                    maximum_batching_window_in_seconds=5
+                )
+            ),
+            target=central_event_bus_arn,
+            target_parameters=aws_pipes.CfnPipe.PipeTargetParametersProperty(
+                event_bridge_event_bus_parameters=aws_pipes.CfnPipe.PipeTargetEventBridgeEventBusParametersProperty(
+                    source="devops.investigation",
+                    detail_type="InvestigationCompleted"
+                ),
+                # Message body is the formatted investigation event; it becomes the event detail
+                input_template="<$.body>"
+            )
+        )
+
         # Grant permission to read/write state to SSM Parameter Store
         investigation_monitor_lambda.add_to_role_policy(
             aws_iam.PolicyStatement(
@@ -87,7 +189,7 @@ class ClientInvestigationStack(Stack):
                     "ssm:PutParameter"
                 ],
                 resources=[
-                    f"arn:aws:ssm:{region}:{account}:parameter/investigation-orchestrator/{client_name}/*"
+                    f"arn:aws:ssm:{region}:{account}:parameter{state_parameter_prefix}/*"
                 ]
             )
         )
@@ -102,7 +204,7 @@ class ClientInvestigationStack(Stack):
                     "devops-agent:DescribeAgentSpace"
                 ],
                 resources=[
-                    f"arn:aws:devops-agent:{devops_agent_config.get('region', 'us-east-1')}:{account}:agent-space/{devops_agent_config.get('agent_space_id', '*')}"
+                    f"arn:aws:devops-agent:{agent_region}:{account}:agent-space/{devops_agent_config.get('agent_space_id', '*')}"
                 ]
             )
         )
@@ -123,33 +225,42 @@ class ClientInvestigationStack(Stack):
             )
         )
 
-        # Grant X-Ray permissions
-        investigation_monitor_lambda.add_to_role_policy(
-            aws_iam.PolicyStatement(
-                effect=aws_iam.Effect.ALLOW,
-                actions=[
-                    "xray:PutTraceSegments",
-                    "xray:PutTelemetryRecords"
-                ],
-                resources=["*"]
-            )
+        # Grant X-Ray permissions (AWS managed policy instead of an inline wildcard statement)
+        investigation_monitor_lambda.role.add_managed_policy(
+            aws_iam.ManagedPolicy.from_aws_managed_policy_name("AWSXRayDaemonWriteAccess")
         )
 
-        # EventBridge schedule to trigger investigation monitor
-        schedule_rate = client_config.get("investigation_monitor", {}).get(
-            "schedule_rate", "rate(5 minutes)"
-        )
+        monitor_config = client_config.get("investigation_monitor", {})
+
+        # Push completed investigations from DevOps Agent logs straight to the monitor
+        # (disable with log_subscription: false until the log group exists)
+        if monitor_config.get("log_subscription", True):
+            devops_agent_log_group = aws_logs.LogGroup.from_log_group_name(
+                self,
+                "DevOpsAgentInvestigationsLogGroup",
+                "/aws/devops-agent/investigations"
+            )
+            aws_logs.SubscriptionFilter(
+                self,
+                "InvestigationCompletedSubscription",
+                log_group=devops_agent_log_group,
+                destination=aws_logs_destinations.LambdaDestination(investigation_monitor_lambda),
+                # Filter server-side on the same condition the Lambda checks
+                filter_pattern=aws_logs.FilterPattern.string_value("$.status", "=", "COMPLETED")
+            )
 
-        rule = aws_events.Rule(
+        # EventBridge schedule - low-frequency reconciliation for anything the subscription missed
+        schedule_rate = monitor_config.get("schedule_rate", "rate(1 hour)")
+
+        aws_events.Rule(
             self,
             "InvestigationMonitorSchedule",
-            rule_name=f"investigation-monitor-schedule-{client_name.lower().replace(' ', '-')}-{environment_name}",
-            description=f"Triggers investigation monitor for {client_name} every 5 minutes",
-            schedule=aws_events.Schedule.expression(schedule_rate)
+            rule_name=f"investigation-monitor-schedule-{client_slug}-{environment_name}",
+            description=f"Reconciles investigation monitor for {client_name} ({schedule_rate})",
+            schedule=aws_events.Schedule.expression(schedule_rate),
+            targets=[aws_events_targets.LambdaFunction(investigation_monitor_lambda)]
         )
 
-        rule.add_target(aws_events_targets.LambdaFunction(investigation_monitor_lambda))
-
         # CloudFormation outputs
         CfnOutput(
             self,
@@ -165,6 +276,20 @@ class ClientInvestigationStack(Stack):
             description="Client name for this deployment"
         )
 
+        CfnOutput(
+            self,
+            "OutboxQueueUrl",
+            value=outbox_queue.queue_url,
+            description="SQS outbox queue feeding the central EventBridge Pipe"
+        )
+
+        CfnOutput(
+            self,
+            "OutboxDeadLetterQueueUrl",
+            value=outbox_dlq.queue_url,
+            description="Investigation events the Pipe failed to deliver to central"
+        )
+
         CfnOutput(
             self,
             "CentralEventBusArn",
@@ -186,14 +311,12 @@ if not client_name:
 
 # Load client configuration
 if config_file:
-    with open(config_file, 'r') as f:
-        client_config = yaml.safe_load(f)
+    client_config = load_client_config(config_file)
 else:
     # Load from default location
     config_path = f"../config/clients/{client_name.lower().replace(' ', '_')}.yaml"
     try:
-        with open(config_path, 'r') as f:
-            client_config = yaml.safe_load(f)
+        client_config = load_client_config(config_path)
     except FileNotFoundError:
         raise ValueError(f"Config file not found: {config_path}. Provide via --context configFile=path/to/config.yaml")
 
@@ -0,0 +1,114 @@
+"""
+Alert Digester Lambda
+
+Coalesces critical investigation alerts into a single email digest.
+
+This Lambda:
+1. Receives batches of SNS alert notifications from the alert digest SQS queue
+2. Combines every alert in the batch into one message
+3. Sends a single email per batch via SES
+
+During incident storms this collapses many correlated alerts into one email
+instead of one SNS email delivery per alert.
+"""
+
+import functools
+import json
+import os
+import boto3
+from botocore.config import Config
+from typing import List, Dict, Any
+
+# AWS clients - created lazily on first use, so clients a code path never touches
+# cost nothing at cold start; adaptive retries smooth out throttling
+BOTO_CONFIG = Config(retries={'mode': 'adaptive', 'max_attempts': 5}, max_pool_connections=20)
+
+
+@functools.lru_cache(maxsize=None)
+def ses_client():
+    return boto3.client('ses', config=BOTO_CONFIG)
+
+# Environment variables
+ALERT_EMAIL = os.environ['ALERT_EMAIL']
+SENDER_EMAIL = os.environ.get('SENDER_EMAIL', ALERT_EMAIL)
+ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
+
+
+def handler(event, context):
+    """
+    Main handler for alert digester
+    
+    Args:
+        event: SQS event with batched SNS alert notifications
+        context: Lambda context
+    
+    Returns:
+        dict: Response with number of alerts digested and batchItemFailures for
+        the records that could not be parsed or emailed, so only those are retried
+    """
+    records = event.get('Records', [])
+    print(f"Alert digester triggered with {len(records)} alerts")
+    
+    alerts = []
+    alert_message_ids = []
+    failed_message_ids = []
+    
+    for record in records:
+        try:
+            alerts.append(parse_alert(record))
+            alert_message_ids.append(record['messageId'])
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            # A malformed record must not block the rest of the digest
+            print(f"Skipping unparseable alert {record.get('messageId')}: {str(e)}")
+            failed_message_ids.append(record.get('messageId'))
+    
+    if alerts:
+        try:
+            send_digest_email(alerts)
+        except Exception as e:
+            print(f"Error sending digest email: {str(e)}")
+            failed_message_ids.extend(alert_message_ids)
+            alerts = []
+    
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'message': 'Digest sent' if alerts else 'No digest sent',
+            'alert_count': len(alerts)
+        }),
+        'batchItemFailures': [
+            {'itemIdentifier': message_id} for message_id in failed_message_ids
+        ]
+    }
+
+
+def parse_alert(record: Dict[str, Any]) -> Dict[str, str]:
+    """Extract subject and message from an SNS notification delivered via SQS"""
+    notification = json.loads(record['body'])
+    return {
+        'subject': notification.get('Subject') or 'Investigation Alert',
+        'message': notification.get('Message', '')
+    }
+
+
+def send_digest_email(alerts: List[Dict[str, str]]):
+    """Send a single email containing every alert in the batch"""
+    if len(alerts) == 1:
+        subject = alerts[0]['subject']
+    else:
+        subject = f"[DIGEST] {len(alerts)} investigation alerts ({ENVIRONMENT})"
+    
+    body = f"\n{'=' * 60}\n".join(
+        f"{alert['subject']}\n{alert['message']}" for alert in alerts
+    )
+    
+    ses_client().send_email(
+        Source=SENDER_EMAIL,
+        Destination={'ToAddresses': [ALERT_EMAIL]},
+        Message={
+            'Subject': {'Data': subject},
+            'Body': {'Text': {'Data': body}}
+        }
+    )
+    
+    print(f"Sent digest email with {len(alerts)} alerts to {ALERT_EMAIL}")
@@ -2,42 +2,133 @@
 Investigation Monitor Lambda
 
 Single Lambda that handles the complete flow:
-1. Polls AWS DevOps Agent for completed investigations (every 5 min)
+1. Receives completed investigations from a CloudWatch Logs subscription
+   (or polls DevOps Agent logs on the hourly reconciliation schedule)
 2. Extracts summary information (no raw logs)
 3. Redacts sensitive data (IPs, emails, secrets)
 4. Generates signed URLs to DevOps Agent web app
-5. Sends formatted event to central account EventBridge
+5. Queues formatted events to the SQS outbox (EventBridge Pipe forwards to central)
 6. Updates state in SSM Parameter Store
 
 This consolidates what was previously two separate Lambdas for simplicity.
 """
 
+import base64
+import gzip
+import functools
 import json
 import os
 import re
+import time
 import boto3
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Tuple
 
-# AWS clients
-events_client = boto3.client('events')
-ssm_client = boto3.client('ssm')
-logs_client = boto3.client('logs')
+# AWS clients - created lazily on first use, so clients a code path never touches
+# cost nothing at cold start; adaptive retries smooth out throttling
+BOTO_CONFIG = Config(retries={'mode': 'adaptive', 'max_attempts': 5}, max_pool_connections=20)
+
+
+@functools.lru_cache(maxsize=None)
+def sqs_client():
+    return boto3.client('sqs', config=BOTO_CONFIG)
+
+
+@functools.lru_cache(maxsize=None)
+def ssm_client():
+    return boto3.client('ssm', config=BOTO_CONFIG)
+
+
+@functools.lru_cache(maxsize=None)
+def logs_client():
+    return boto3.client('logs', config=BOTO_CONFIG)
 
 # Environment variables
 CLIENT_NAME = os.environ['CLIENT_NAME']
 CLIENT_ACCOUNT_ID = os.environ['CLIENT_ACCOUNT_ID']
-CENTRAL_EVENT_BUS_ARN = os.environ['CENTRAL_EVENT_BUS_ARN']
+OUTBOX_QUEUE_URL = os.environ['OUTBOX_QUEUE_URL']
 DEVOPS_AGENT_SPACE_ID = os.environ.get('DEVOPS_AGENT_SPACE_ID', '')
 DEVOPS_AGENT_REGION = os.environ.get('DEVOPS_AGENT_REGION', 'us-east-1')
 STATE_PARAMETER_NAME = os.environ['STATE_PARAMETER_NAME']
 ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
-TAGS = eval(os.environ.get('TAGS', '{}'))
-
-# Regex patterns for redaction
-IP_PATTERN = re.compile(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b')
-EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
-SECRET_PATTERN = re.compile(r'(password|secret|key|token)[\s:=]+[^\s]+', re.IGNORECASE)
+TAGS = json.loads(os.environ.get('TAGS', '{}'))  # JSON-encoded by the client stack
+AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
+
+# Console links - only the investigation ID varies, so build the rest once
+DEVOPS_AGENT_LOG_GROUP = '/aws/devops-agent/investigations'
+DEVOPS_AGENT_URL_PREFIX = f"https://devops-agent.console.aws.amazon.com/spaces/{DEVOPS_AGENT_SPACE_ID}/investigations/"
+DEVOPS_AGENT_URL_SUFFIX = f"?region={AWS_REGION}"
+CLOUDWATCH_LOGS_URL = (
+    f"https://console.aws.amazon.com/cloudwatch/home?region={AWS_REGION}"
+    f"#logsV2:log-groups/log-group/{DEVOPS_AGENT_LOG_GROUP.replace('/', '$252F')}"
+)
+
+# Highest last processed timestamp this container has read or written. Not used to
+# answer reads - it only lets update_last_processed_time skip writes (and the
+# re-read before them) that wouldn't advance the parameter, e.g. on every push
+# delivery of investigations older than ones this container already recorded
+_LAST_KNOWN_TIME = None
+
+# SQS SendMessageBatch limits (entries per call, total payload with some headroom)
+MAX_BATCH_ENTRIES = 10
+MAX_BATCH_BYTES = 250_000
+
+# Concurrent SendMessageBatch calls when a backlog spans several batches
+MAX_SEND_WORKERS = 10
+
+# Retries for entries SQS rejects on its side (throttling, internal errors)
+MAX_SEND_ATTEMPTS = 3
+RETRY_BASE_DELAY_SECONDS = 0.2
+
+# CloudWatch Logs JSON filter - only completed investigations leave the service
+COMPLETED_FILTER_PATTERN = '{ $.status = "COMPLETED" }'
+
+# Regex patterns for redaction, fused into one alternation so the text is scanned once
+# ([0-9] rather than \d: only ASCII digits make an IP, \d also matches other scripts)
+IP_REGEX = r'\b[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\b'
+EMAIL_REGEX = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+# A possessive value keeps the regex engine from backtracking through long secret
+# values. The separator run stays backtrackable so "password=:" still gives ":"
+# back to the value
+# Only the end of the keyword is fenced with \b: "keystore" doesn't match, while
+# any prefix still does (api_key, apiKey, clientSecret - the prefix is kept as is)
+SECRET_REGEX = (
+    r'(?P<secret_key>password|secret|key|token)\b'
+    r'[\s:=]+\S++'
+)
+REDACT_PATTERN = re.compile(
+    '|'.join(f'(?P<{name}>{regex})' for name, regex in [
+        ('ip', IP_REGEX),
+        ('email', EMAIL_REGEX),
+        ('secret', SECRET_REGEX),
+    ]),
+    re.IGNORECASE
+)
+REDACTIONS = {'ip': 'REDACTED_IP', 'email': 'REDACTED_EMAIL'}
+
+
+# Root cause keywords by category, in priority order (substring match, case-insensitive)
+ROOT_CAUSE_CATEGORIES = [
+    ('network_connectivity', ['connection', 'timeout', 'network']),
+    ('resource_exhaustion', ['memory', 'cpu', 'disk', 'capacity']),
+    ('permissions_issue', ['permission', 'access', 'denied', 'unauthorized']),
+    ('deployment_issue', ['deployment', 'version', 'rollout']),
+    ('dependency_failure', ['dependency', 'service', 'downstream']),
+]
+CATEGORY_BY_KEYWORD = {
+    keyword: category
+    for category, keywords in ROOT_CAUSE_CATEGORIES
+    for keyword in keywords
+}
+CATEGORY_PRIORITY = {category: i for i, (category, _) in enumerate(ROOT_CAUSE_CATEGORIES)}
+# One alternation, so classification is a single scan however many keywords there are.
+# Kept separate from REDACT_PATTERN on purpose - it scans the full root cause
+# rather than the 200-char brief, and a keyword inside a secret still counts.
+# Case-sensitive and run over root_cause.lower(): a case-insensitive pattern also
+# matches Unicode variants (e.g. "ſervice") that aren't CATEGORY_BY_KEYWORD keys
+ROOT_CAUSE_KEYWORD_PATTERN = re.compile('|'.join(CATEGORY_BY_KEYWORD))
 
 
 def handler(event, context):
@@ -45,7 +136,7 @@ def handler(event, context):
     Main handler for investigation monitor
     
     Args:
-        event: EventBridge scheduled event
+        event: CloudWatch Logs subscription event or EventBridge scheduled event
         context: Lambda context
     
     Returns:
@@ -54,12 +145,19 @@ def handler(event, context):
     print(f"Investigation monitor triggered for {CLIENT_NAME}")
     
     try:
-        # Step 1: Get last processed timestamp from state
-        last_processed_time = get_last_processed_time()
-        print(f"Last processed time: {last_processed_time}")
-        
-        # Step 2: Query DevOps Agent for completed investigations
-        completed_investigations = get_completed_investigations(last_processed_time)
+        if 'awslogs' in event:
+            # Push path: log events arrive in the payload, no polling needed
+            completed_investigations = parse_investigation_log_events(
+                decode_log_subscription_events(event)
+            )
+        else:
+            # Reconciliation path
+            # Step 1: Get last processed timestamp from state
+            last_processed_time = get_last_processed_time()
+            print(f"Last processed time: {last_processed_time}")
+            
+            # Step 2: Query DevOps Agent for completed investigations
+            completed_investigations = get_completed_investigations(last_processed_time)
         
         if not completed_investigations:
             print("No new completed investigations found")
@@ -73,26 +171,31 @@ def handler(event, context):
         
         print(f"Found {len(completed_investigations)} completed investigations")
         
-        # Step 3: Process each completed investigation
-        processed_count = 0
+        # Step 3: Format each completed investigation
+        formatted_events = []
         for investigation in completed_investigations:
             try:
-                # Format the investigation event
-                formatted_event = format_investigation_event(investigation)
-                
-                # Send to central EventBridge
-                send_to_central_eventbridge(formatted_event)
-                
-                processed_count += 1
+                formatted_events.append(format_investigation_event(investigation))
             except Exception as e:
                 print(f"Error processing investigation {investigation['investigation_id']}: {str(e)}")
                 # Continue processing other investigations
         
-        # Step 4: Update state with latest processed time
-        if completed_investigations:
-            latest_time = max(inv['completed_at'] for inv in completed_investigations)
+        # Queue formatted events for the central EventBridge Pipe
+        queued_events, unsent_events = send_to_outbox_queue(formatted_events)
+        processed_count = len(queued_events)
+        
+        # Step 4: Advance the watermark up to the first event that failed to send,
+        # so the next reconciliation retries it. Investigations that failed to
+        # format or were rejected by SQS never succeed, so they don't hold it back
+        latest_time = latest_settled_time(completed_investigations, unsent_events)
+        if latest_time:
             update_last_processed_time(latest_time)
         
+        # A later push would move the watermark past these, so fail the delivery
+        # and let Lambda's async retry send them again
+        if unsent_events and 'awslogs' in event:
+            raise RuntimeError(f"{len(unsent_events)} investigations could not be queued")
+        
         return {
             'statusCode': 200,
             'body': json.dumps({
@@ -111,24 +214,74 @@ def handler(event, context):
 
 def get_last_processed_time() -> str:
     """Get last processed timestamp from SSM Parameter Store"""
-    try:
-        response = ssm_client.get_parameter(Name=STATE_PARAMETER_NAME)
-        return response['Parameter']['Value']
-    except ssm_client.exceptions.ParameterNotFound:
+    last_processed_time = read_last_processed_time()
+    if last_processed_time is None:
         # First run, use 1 hour ago as default
         one_hour_ago = datetime.utcnow() - timedelta(hours=1)
         return one_hour_ago.isoformat()
+    
+    return last_processed_time
+
+
+def read_last_processed_time() -> Optional[str]:
+    """Read the stored timestamp from SSM (None if never written) and remember it"""
+    global _LAST_KNOWN_TIME
+    
+    try:
+        response = ssm_client().get_parameter(Name=STATE_PARAMETER_NAME)
+    except ssm_client().exceptions.ParameterNotFound:
+        return None
+    
+    _LAST_KNOWN_TIME = response['Parameter']['Value']
+    return _LAST_KNOWN_TIME
 
 
 def update_last_processed_time(timestamp: str):
-    """Update last processed timestamp in SSM Parameter Store"""
-    ssm_client.put_parameter(
+    """Advance last processed timestamp in SSM Parameter Store (never moves it backwards)"""
+    global _LAST_KNOWN_TIME
+    
+    # The parameter only moves forward, so a value we've seen is a lower bound on it
+    if _LAST_KNOWN_TIME and timestamp <= _LAST_KNOWN_TIME:
+        return
+    
+    # Re-read before writing: another container or an out-of-order subscription
+    # delivery may already have advanced it past this timestamp
+    current_time = read_last_processed_time()
+    if current_time is not None and timestamp <= current_time:
+        return
+    
+    ssm_client().put_parameter(
         Name=STATE_PARAMETER_NAME,
         Value=timestamp,
         Type='String',
         Overwrite=True,
         Description=f'Last processed investigation timestamp for {CLIENT_NAME}'
     )
+    _LAST_KNOWN_TIME = timestamp
+
+
+def latest_settled_time(
+    investigations: List[Dict[str, Any]],
+    unsent_events: List[Dict[str, Any]]
+) -> Optional[str]:
+    """
+    Latest completion time the watermark can safely advance to
+    
+    Args:
+        investigations: Investigations this invocation tried to process
+        unsent_events: Formatted events that failed to send but may succeed on retry
+    
+    Returns:
+        Latest completed_at among investigations that precede every unsent event
+        (None if there is no such investigation)
+    """
+    settled_times = [inv['completed_at'] for inv in investigations]
+    
+    if unsent_events:
+        earliest_unsent = min(event['timestamp'] for event in unsent_events)
+        settled_times = [t for t in settled_times if t < earliest_unsent]
+    
+    return max(settled_times, default=None)
 
 
 # ===== DEVOPS AGENT POLLING =====
@@ -150,37 +303,26 @@ def get_completed_investigations(since_time: str) -> List[Dict[str, Any]]:
     
     try:
         # Parse CloudWatch Logs for DevOps Agent activity
-        log_group_name = '/aws/devops-agent/investigations'
+        log_group_name = DEVOPS_AGENT_LOG_GROUP
         
-        # Convert since_time to timestamp
-        since_timestamp = int(datetime.fromisoformat(since_time.replace('Z', '')).timestamp() * 1000)
+        # Convert since_time (naive UTC) to timestamp. startTime is inclusive and the
+        # watermark is the last processed event's own timestamp, so start just past it
+        since_datetime = datetime.fromisoformat(since_time.replace('Z', '')).replace(tzinfo=timezone.utc)
+        since_timestamp = round(since_datetime.timestamp() * 1000) + 1
         
-        response = logs_client.filter_log_events(
+        # A single call returns at most one page (1 MB / 10k events), so page
+        # through everything since the watermark rather than dropping the rest
+        paginator = logs_client().get_paginator('filter_log_events')
+        pages = paginator.paginate(
             logGroupName=log_group_name,
             startTime=since_timestamp,
-            filterPattern='investigation_completed'
+            filterPattern=COMPLETED_FILTER_PATTERN
         )
         
-        for event in response.get('events', []):
-            message = event.get('message', '')
-            
-            # Parse investigation completion from log message
-            try:
-                investigation_data = json.loads(message)
-                if investigation_data.get('status') == 'COMPLETED':
-                    investigations.append({
-                        'investigation_id': investigation_data.get('investigation_id'),
-                        'severity': investigation_data.get('severity', 'MEDIUM'),
-                        'root_cause': investigation_data.get('root_cause', ''),
-                        'affected_resources': investigation_data.get('affected_resources', []),
-                        'completed_at': datetime.utcfromtimestamp(event['timestamp'] / 1000).isoformat(),
-                        'duration_minutes': investigation_data.get('duration_minutes', 0)
-                    })
-            except json.JSONDecodeError:
-                print(f"Could not parse log message: {message}")
-                continue
+        for page in pages:
+            investigations.extend(parse_investigation_log_events(page.get('events', [])))
         
-    except logs_client.exceptions.ResourceNotFoundException:
+    except logs_client().exceptions.ResourceNotFoundException:
         print(f"Log group not found: {log_group_name}")
         print("This is expected if DevOps Agent hasn't created logs yet")
     except Exception as e:
@@ -189,9 +331,56 @@ def get_completed_investigations(since_time: str) -> List[Dict[str, Any]]:
     return investigations
 
 
+def decode_log_subscription_events(event: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Decode the gzipped, base64-encoded CloudWatch Logs subscription payload"""
+    payload = json.loads(gzip.decompress(base64.b64decode(event['awslogs']['data'])))
+    return payload.get('logEvents', [])
+
+
+def parse_investigation_log_events(log_events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Extract completed investigations from DevOps Agent log events
+    
+    Args:
+        log_events: Log events with 'message' and 'timestamp' (ms since epoch)
+    
+    Returns:
+        List of completed investigations
+    """
+    investigations = []
+    append = investigations.append
+    utcfromtimestamp = datetime.utcfromtimestamp
+    
+    for event in log_events:
+        message = event.get('message', '')
+        
+        # Cheap reject for plain-text lines - far less costly than a failed parse
+        if not message or message[0] != '{':
+            continue
+        
+        # Parse investigation completion from log message
+        try:
+            investigation_data = json.loads(message)
+            if investigation_data.get('status') == 'COMPLETED':
+                append({
+                    'investigation_id': investigation_data.get('investigation_id'),
+                    # "or" rather than a .get() default: the agent logs null for missing fields
+                    'severity': investigation_data.get('severity') or 'MEDIUM',
+                    'root_cause': investigation_data.get('root_cause') or '',
+                    'affected_resources': investigation_data.get('affected_resources') or [],
+                    'completed_at': utcfromtimestamp(event['timestamp'] / 1000).isoformat(),
+                    'duration_minutes': investigation_data.get('duration_minutes') or 0
+                })
+        except ValueError:
+            print(f"Could not parse log message: {message}")
+            continue
+    
+    return investigations
+
+
 # ===== EVENT FORMATTING =====
 
-def format_investigation_event(investigation: Dict[str, Any]) -> Dict[str, Any]:
+def format_investigation_event(investigation: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
     """
     Format investigation into event schema for central account
     
@@ -199,7 +388,7 @@ def format_investigation_event(investigation: Dict[str, Any]) -> Dict[str, Any]:
         investigation: Raw investigation data
     
     Returns:
-        Formatted event dictionary
+        Formatted event dictionary and its serialized JSON body
     """
     investigation_id = investigation.get('investigation_id', 'unknown')
     
@@ -236,97 +425,167 @@ def format_investigation_event(investigation: Dict[str, Any]) -> Dict[str, Any]:
         'tags': TAGS
     }
     
+    # Serialize once - the body is reused for the size check and the send.
+    # json.dumps escapes non-ASCII by default, so len() is the byte size
+    body = json.dumps(event)
+    
     # Validate event size
-    event_size = len(json.dumps(event).encode('utf-8'))
+    event_size = len(body)
     if event_size > 200_000:  # 200 KB warning
         print(f"WARNING: Event size {event_size} bytes is large")
     
     if event_size > 256_000:  # 256 KB hard limit
         raise ValueError(f"Event size {event_size} bytes exceeds EventBridge limit")
     
-    return event
+    return event, body
 
 
 def extract_resource_types(resources: list) -> list:
     """Extract unique resource types from ARNs"""
-    types = set()
-    for resource in resources:
-        if isinstance(resource, str) and resource.startswith('arn:'):
-            # ARN format: arn:partition:service:region:account:resource
-            parts = resource.split(':')
-            if len(parts) >= 6:
-                service = parts[2]
-                types.add(service.upper())
-    return list(types)
+    # ARN format: arn:partition:service:region:account:resource - only the
+    # service is needed, so stop splitting once it has been reached
+    return list({
+        resource.split(':', 3)[2].upper()
+        for resource in resources
+        if isinstance(resource, str) and resource.startswith('arn:') and resource.count(':') >= 5
+    })
 
 
 def categorize_root_cause(root_cause: str) -> str:
     """Categorize root cause into high-level categories"""
-    root_cause_lower = root_cause.lower()
-    
-    if any(keyword in root_cause_lower for keyword in ['connection', 'timeout', 'network']):
-        return 'network_connectivity'
-    elif any(keyword in root_cause_lower for keyword in ['memory', 'cpu', 'disk', 'capacity']):
-        return 'resource_exhaustion'
-    elif any(keyword in root_cause_lower for keyword in ['permission', 'access', 'denied', 'unauthorized']):
-        return 'permissions_issue'
-    elif any(keyword in root_cause_lower for keyword in ['deployment', 'version', 'rollout']):
-        return 'deployment_issue'
-    elif any(keyword in root_cause_lower for keyword in ['dependency', 'service', 'downstream']):
-        return 'dependency_failure'
-    else:
+    text = root_cause.lower()
+    categories = set()
+    
+    # Resume one character past each match's start rather than at its end: keywords
+    # can overlap ("versionetwork") and substring semantics must see both. No keyword
+    # is a prefix of another, so each start position yields at most one keyword
+    match = ROOT_CAUSE_KEYWORD_PATTERN.search(text)
+    while match:
+        categories.add(CATEGORY_BY_KEYWORD[match.group()])
+        match = ROOT_CAUSE_KEYWORD_PATTERN.search(text, match.start() + 1)
+    
+    if not categories:
         return 'unknown'
+    
+    # Several categories can match; the earliest in ROOT_CAUSE_CATEGORIES wins
+    return min(categories, key=CATEGORY_PRIORITY.__getitem__)
 
 
 def redact_sensitive_data(text: str) -> str:
-    """Redact sensitive data from text"""
-    # Redact IP addresses
-    text = IP_PATTERN.sub('REDACTED_IP', text)
-    
-    # Redact email addresses
-    text = EMAIL_PATTERN.sub('REDACTED_EMAIL', text)
-    
-    # Redact secrets/passwords
-    text = SECRET_PATTERN.sub(r'\1: REDACTED', text)
-    
-    return text
+    """Redact sensitive data (IP addresses, emails, secrets) from text in a single pass"""
+    return REDACT_PATTERN.sub(_redaction_for, text)
+
+
+def _redaction_for(match) -> str:
+    if match.lastgroup == 'secret':
+        return f"{match.group('secret_key')}: REDACTED"
+    return REDACTIONS[match.lastgroup]
 
 
 def generate_devops_agent_link(investigation_id: str) -> str:
     """Generate link to DevOps Agent investigation"""
-    region = os.environ.get('AWS_REGION', 'us-east-1')
-    return f"https://devops-agent.console.aws.amazon.com/spaces/{DEVOPS_AGENT_SPACE_ID}/investigations/{investigation_id}?region={region}"
+    return f"{DEVOPS_AGENT_URL_PREFIX}{investigation_id}{DEVOPS_AGENT_URL_SUFFIX}"
 
 
 def generate_cloudwatch_logs_link() -> str:
     """Generate link to CloudWatch Logs"""
-    region = os.environ.get('AWS_REGION', 'us-east-1')
-    log_group = '/aws/devops-agent/investigations'
-    return f"https://console.aws.amazon.com/cloudwatch/home?region={region}#logsV2:log-groups/log-group/{log_group.replace('/', '$252F')}"
+    return CLOUDWATCH_LOGS_URL
 
 
 # ===== SEND TO CENTRAL =====
 
-def send_to_central_eventbridge(event: Dict[str, Any]):
+def send_to_outbox_queue(
+    events: List[Tuple[Dict[str, Any], str]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Send formatted events to the SQS outbox in batches
+    
+    Batches hold up to 10 events and are flushed early before their total
+    body size would exceed the SendMessageBatch payload limit. When there is
+    more than one batch (a reconciliation backlog), the calls are sent
+    concurrently. The EventBridge Pipe on the outbox queue forwards each
+    message to the central account EventBridge as a devops.investigation event.
+    
+    Args:
+        events: (formatted event, serialized body) pairs from format_investigation_event
+    
+    Returns:
+        Formatted events successfully queued, and those that failed with a
+        retryable error (events SQS rejects as invalid are in neither list)
+    """
+    batches = []
+    batch = []
+    batch_bytes = 0
+    
+    for event, body in events:
+        if batch and (len(batch) == MAX_BATCH_ENTRIES or batch_bytes + len(body) > MAX_BATCH_BYTES):
+            batches.append(batch)
+            batch = []
+            batch_bytes = 0
+        batch.append((event, body))
+        batch_bytes += len(body)
+    
+    if batch:
+        batches.append(batch)
+    
+    if len(batches) <= 1:
+        results = [send_message_batch(batch) for batch in batches]
+    else:
+        # Build the client before fanning out - client creation isn't thread-safe,
+        # the client itself is
+        sqs_client()
+        with ThreadPoolExecutor(max_workers=min(MAX_SEND_WORKERS, len(batches))) as executor:
+            results = list(executor.map(send_message_batch, batches))
+    
+    queued_events = [event for queued, _ in results for event in queued]
+    unsent_events = [event for _, unsent in results for event in unsent]
+    return queued_events, unsent_events
+
+
+def send_message_batch(
+    batch: List[Tuple[Dict[str, Any], str]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
     """
-    Send formatted event to central account EventBridge
+    Send one SendMessageBatch call, retrying server-side failures with backoff
     
     Args:
-        event: Formatted investigation event
+        batch: (event, serialized body) pairs, at most MAX_BATCH_ENTRIES
+    
+    Returns:
+        Formatted events successfully queued, and those still failing after
+        every attempt (sender faults are dropped, they would never succeed)
     """
-    response = events_client.put_events(
-        Entries=[{
-            'Source': 'devops.investigation',
-            'DetailType': 'InvestigationCompleted',
-            'Detail': json.dumps(event),
-            'EventBusName': CENTRAL_EVENT_BUS_ARN
-        }]
-    )
+    queued_events = []
+    pending = {str(j): entry for j, entry in enumerate(batch)}
+    
+    for attempt in range(MAX_SEND_ATTEMPTS):
+        if attempt:
+            time.sleep(RETRY_BASE_DELAY_SECONDS * 2 ** (attempt - 1))
+        
+        response = sqs_client().send_message_batch(
+            QueueUrl=OUTBOX_QUEUE_URL,
+            Entries=[
+                {'Id': entry_id, 'MessageBody': body}
+                for entry_id, (_, body) in pending.items()
+            ]
+        )
+        
+        for entry in response.get('Successful', []):
+            event, _ = pending.pop(entry['Id'])
+            print(f"Queued event for central EventBridge: {event['investigation_id']}")
+            queued_events.append(event)
+        
+        # Check for failures - sender faults (e.g. invalid message) will never succeed
+        for entry in response.get('Failed', []):
+            if entry.get('SenderFault'):
+                event, _ = pending.pop(entry['Id'])
+                print(f"Failed to queue event {event['investigation_id']}: {entry.get('Code')} {entry.get('Message', '')}")
+        
+        if not pending:
+            break
     
-    # Check for failures
-    if response['FailedEntryCount'] > 0:
-        failed_entries = [e for e in response['Entries'] if 'ErrorCode' in e]
-        raise Exception(f"Failed to send events: {failed_entries}")
+    unsent_events = [event for event, _ in pending.values()]
+    for event in unsent_events:
+        print(f"Failed to queue event {event['investigation_id']} after {MAX_SEND_ATTEMPTS} attempts")
     
-    print(f"Successfully sent event to central EventBridge: {event['investigation_id']}")
-    print(f"Event size: {len(json.dumps(event))} bytes")
+    return queued_events, unsent_events
@@ -11,25 +11,60 @@ This Lambda:
 5. Alerts senior engineers for correlated issues
 """
 
+import functools
 import json
 import os
+import time
 import boto3
+from collections import defaultdict
+from botocore.config import Config
+from boto3.dynamodb.conditions import Key
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 
-# AWS clients
-dynamodb = boto3.resource('dynamodb')
-bedrock = boto3.client('bedrock-runtime')
-sns_client = boto3.client('sns')
+# AWS clients - created lazily on first use, so clients a code path never touches
+# cost nothing at cold start; adaptive retries smooth out throttling
+BOTO_CONFIG = Config(retries={'mode': 'adaptive', 'max_attempts': 5}, max_pool_connections=20)
+
+
+@functools.lru_cache(maxsize=None)
+def dynamodb():
+    return boto3.resource('dynamodb', config=BOTO_CONFIG)
+
+
+@functools.lru_cache(maxsize=None)
+def bedrock():
+    return boto3.client('bedrock-runtime', config=BOTO_CONFIG)
+
+
+@functools.lru_cache(maxsize=None)
+def sns_client():
+    return boto3.client('sns', config=BOTO_CONFIG)
+
+
+@functools.lru_cache(maxsize=None)
+def ssm_client():
+    return boto3.client('ssm', config=BOTO_CONFIG)
 
 # Environment variables
 INVESTIGATIONS_TABLE_NAME = os.environ['INVESTIGATIONS_TABLE']
 ALERT_TOPIC_ARN = os.environ['ALERT_TOPIC_ARN']
-BEDROCK_MODEL_ID = os.environ['BEDROCK_MODEL_ID']
+BEDROCK_MODEL_PARAM = os.environ.get('BEDROCK_MODEL_PARAM', '/investigation-orchestrator/bedrock-model-id')
 ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
 
+# Distinct clients that must share a root cause category before Bedrock is asked
+MIN_CLIENTS_FOR_PATTERN = 3
+
+# Model ID is re-read from SSM at most every 5 minutes (swap models without a redeploy)
+MODEL_ID_TTL_SECONDS = 300
+
 # DynamoDB table
-investigations_table = dynamodb.Table(INVESTIGATIONS_TABLE_NAME)
+@functools.lru_cache(maxsize=None)
+def investigations_table():
+    return dynamodb().Table(INVESTIGATIONS_TABLE_NAME)
+
+
+TIME_INDEX_NAME = 'EnvironmentTimeIndex'
 
 
 def handler(event, context):
@@ -66,8 +101,21 @@ def handler(event, context):
                 'body': json.dumps({'message': 'Insufficient data for pattern detection'})
             }
         
+        # Only worth a Bedrock call if enough clients share a root cause category
+        candidates = find_candidate_investigations(recent_investigations)
+        if not candidates:
+            print("No root cause category spans enough clients, skipping Bedrock")
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': 'No cross-client pattern candidates',
+                    'patterns_detected': False,
+                    'investigation_id': investigation_id
+                })
+            }
+        
         # Analyze patterns with Bedrock
-        analysis = analyze_patterns_with_bedrock(recent_investigations)
+        analysis = analyze_patterns_with_bedrock(candidates)
         
         # If patterns detected, alert senior engineer
         if analysis.get('patterns_detected'):
@@ -91,14 +139,48 @@ def query_recent_investigations(hours: int = 24) -> List[Dict[str, Any]]:
     """Query recent investigations from DynamoDB"""
     cutoff_time = (datetime.utcnow() - timedelta(hours=hours)).isoformat()
     
-    # Query by timestamp (requires GSI or scan)
-    response = investigations_table.scan(
-        FilterExpression='#ts >= :cutoff',
-        ExpressionAttributeNames={'#ts': 'timestamp'},
-        ExpressionAttributeValues={':cutoff': cutoff_time}
-    )
+    # Query the time index (environment + timestamp range), following pagination.
+    # Items written before the index existed only appear once backfill_index_attributes.py has run
+    query_kwargs = {
+        'IndexName': TIME_INDEX_NAME,
+        'KeyConditionExpression': Key('environment').eq(ENVIRONMENT) & Key('timestamp').gte(cutoff_time)
+    }
+    
+    items = []
+    while True:
+        response = investigations_table().query(**query_kwargs)
+        items.extend(response.get('Items', []))
+        
+        if 'LastEvaluatedKey' not in response:
+            return items
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def find_candidate_investigations(investigations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Pre-filter investigations to the ones that could form a cross-client pattern
+    
+    Args:
+        investigations: List of recent investigations
+    
+    Returns:
+        Investigations whose root cause category is shared by at least
+        MIN_CLIENTS_FOR_PATTERN distinct clients (empty if none qualify)
+    """
+    clients_by_category = defaultdict(set)
+    for inv in investigations:
+        clients_by_category[inv['summary']['root_cause_category']].add(inv['client_name'])
+    
+    candidate_categories = {
+        category
+        for category, clients in clients_by_category.items()
+        if len(clients) >= MIN_CLIENTS_FOR_PATTERN
+    }
     
-    return response.get('Items', [])
+    return [
+        inv for inv in investigations
+        if inv['summary']['root_cause_category'] in candidate_categories
+    ]
 
 
 def analyze_patterns_with_bedrock(investigations: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -114,10 +196,10 @@ def analyze_patterns_with_bedrock(investigations: List[Dict[str, Any]]) -> Dict[
     # Prepare prompt for Bedrock
     prompt = build_analysis_prompt(investigations)
     
-    # Call Bedrock
+    # Call Bedrock, streaming so we can stop as soon as the JSON answer is complete
     try:
-        response = bedrock.invoke_model(
-            modelId=BEDROCK_MODEL_ID,
+        response = bedrock().invoke_model_with_response_stream(
+            modelId=get_bedrock_model_id(),
             contentType='application/json',
             accept='application/json',
             body=json.dumps({
@@ -132,37 +214,64 @@ def analyze_patterns_with_bedrock(investigations: List[Dict[str, Any]]) -> Dict[
             })
         )
         
-        # Parse response
-        response_body = json.loads(response['body'].read())
-        analysis_text = response_body['content'][0]['text']
+        # Accumulate text deltas; only try a parse when a chunk closes an object
+        stream = response['body']
+        text_chunks = []
+        for stream_event in stream:
+            chunk = json.loads(stream_event['chunk']['bytes'])
+            if chunk.get('type') != 'content_block_delta':
+                continue
+            
+            text = chunk['delta'].get('text', '')
+            text_chunks.append(text)
+            if text.rstrip().endswith('}'):
+                try:
+                    analysis = json.loads(strip_code_fence(''.join(text_chunks)))
+                except json.JSONDecodeError:
+                    continue
+                stream.close()
+                return analysis
         
-        # Parse structured response
-        analysis = parse_bedrock_response(analysis_text)
-        
-        return analysis
+        # Stream ended without a complete object - parse (and log) what we got
+        return parse_bedrock_response(''.join(text_chunks))
         
     except Exception as e:
         print(f"Error calling Bedrock: {str(e)}")
         return {'patterns_detected': False, 'error': str(e)}
 
 
+@functools.lru_cache(maxsize=1)
+def _fetch_bedrock_model_id(ttl_bucket: int) -> str:
+    response = ssm_client().get_parameter(Name=BEDROCK_MODEL_PARAM)
+    return response['Parameter']['Value']
+
+
+def get_bedrock_model_id() -> str:
+    """Get Bedrock model ID from SSM Parameter Store, cached per TTL window"""
+    return _fetch_bedrock_model_id(int(time.time() // MODEL_ID_TTL_SECONDS))
+
+
 def build_analysis_prompt(investigations: List[Dict[str, Any]]) -> str:
     """Build prompt for Bedrock analysis"""
-    investigations_summary = []
+    # One pipe-delimited row per investigation - far fewer tokens than indented JSON
+    rows = ['client|severity|root_cause_category|resource_types|timestamp']
     
     for inv in investigations:
-        investigations_summary.append({
-            'client': inv['client_name'],
-            'severity': inv['severity'],
-            'root_cause_category': inv['summary']['root_cause_category'],
-            'resource_types': inv['summary']['resource_types'],
-            'timestamp': inv['timestamp']
-        })
+        rows.append('|'.join([
+            inv['client_name'],
+            inv['severity'],
+            inv['summary']['root_cause_category'],
+            ','.join(inv['summary']['resource_types']),
+            inv['timestamp']
+        ]))
+    
+    investigation_rows = '\n'.join(rows)
     
     prompt = f"""You are a senior cloud engineer analyzing incidents across multiple clients.
 
-Recent investigations (last 24 hours):
-{json.dumps(investigations_summary, indent=2)}
+Recent investigations (last 24 hours), one per row, pipe-delimited with a header row
+(resource_types is comma-separated):
+{investigation_rows}
 
 Tasks:
 1. Identify if multiple clients are affected by the same underlying issue
@@ -186,14 +295,7 @@ Respond in JSON format:
 def parse_bedrock_response(response_text: str) -> Dict[str, Any]:
     """Parse Bedrock response into structured format"""
     try:
-        # Remove markdown code blocks if present
-        cleaned = response_text.strip()
-        if cleaned.startswith('```json'):
-            cleaned = cleaned[7:]
-        if cleaned.endswith('```'):
-            cleaned = cleaned[:-3]
-        
-        analysis = json.loads(cleaned.strip())
+        analysis = json.loads(strip_code_fence(response_text))
         return analysis
     except json.JSONDecodeError as e:
         print(f"Error parsing Bedrock response: {str(e)}")
@@ -204,6 +306,16 @@ def parse_bedrock_response(response_text: str) -> Dict[str, Any]:
         }
 
 
+def strip_code_fence(text: str) -> str:
+    """Remove markdown code blocks if present"""
+    cleaned = text.strip()
+    if cleaned.startswith('```json'):
+        cleaned = cleaned[7:]
+    if cleaned.endswith('```'):
+        cleaned = cleaned[:-3]
+    return cleaned.strip()
+
+
 def alert_senior_engineer(analysis: Dict[str, Any]):
     """Alert senior engineer about detected patterns"""
     subject = f"[PATTERN DETECTED] Multiple Client Incident Correlation"
@@ -226,7 +338,7 @@ This indicates a potential broader issue affecting multiple clients.
 Please review the investigations and coordinate response.
 """
     
-    sns_client.publish(
+    sns_client().publish(
         TopicArn=ALERT_TOPIC_ARN,
         Subject=subject,
         Message=message
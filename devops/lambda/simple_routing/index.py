@@ -6,20 +6,43 @@ Handles 90% of investigation events with deterministic routing:
 - MEDIUM → Create Jira ticket
 - All → Store in DynamoDB
 
+Accepts a single EventBridge event or a batch of SQS records, so DynamoDB
+writes and SNS alerts are batched when events arrive together. SQS batches
+report per-message failures, so a retry only repeats the failed messages.
+
 This Lambda keeps logic simple and fast for most cases.
 Complex pattern detection is handled by a separate Lambda.
 """
 
+import functools
 import json
 import os
+import time
 import boto3
+from boto3.dynamodb.types import TypeSerializer
+from botocore.config import Config
 from datetime import datetime
-from typing import Dict, Any
+from decimal import Decimal
+from typing import List, Dict, Any, Optional, Tuple
+
+# AWS clients - created lazily on first use, so clients a code path never touches
+# cost nothing at cold start; adaptive retries smooth out throttling
+BOTO_CONFIG = Config(retries={'mode': 'adaptive', 'max_attempts': 5}, max_pool_connections=20)
+
+
+@functools.lru_cache(maxsize=None)
+def dynamodb():
+    return boto3.resource('dynamodb', config=BOTO_CONFIG)
+
 
-# AWS clients
-dynamodb = boto3.resource('dynamodb')
-sns_client = boto3.client('sns')
-secretsmanager_client = boto3.client('secretsmanager')
+@functools.lru_cache(maxsize=None)
+def sns_client():
+    return boto3.client('sns', config=BOTO_CONFIG)
+
+
+@functools.lru_cache(maxsize=None)
+def secretsmanager_client():
+    return boto3.client('secretsmanager', config=BOTO_CONFIG)
 
 # Environment variables
 INVESTIGATIONS_TABLE_NAME = os.environ['INVESTIGATIONS_TABLE']
@@ -28,8 +51,38 @@ PAGERDUTY_SECRET_NAME = os.environ.get('PAGERDUTY_API_KEY_SECRET', '')
 JIRA_SECRET_NAME = os.environ.get('JIRA_API_KEY_SECRET', '')
 ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
 
+# Investigations expire from DynamoDB (via TTL) after 90 days
+INVESTIGATION_TTL_SECONDS = 90 * 86400
+
+# Severities this Lambda acts on (also filtered by the EventBridge rule)
+ROUTED_SEVERITIES = {'CRITICAL', 'HIGH', 'MEDIUM'}
+
+# Severities that page, ticket and alert (MEDIUM only gets a ticket)
+ALERTED_SEVERITIES = {'CRITICAL', 'HIGH'}
+
+# SNS PublishBatch limit
+MAX_PUBLISH_BATCH_ENTRIES = 10
+
+# Validates items before they are buffered: batch_writer only serializes when it
+# flushes, where one bad value (e.g. a float) would fail every item in the batch
+ITEM_SERIALIZER = TypeSerializer()
+
+# Secrets cached across warm invocations as {name: (fetched_at, value)}
+_SECRET_CACHE = {}
+SECRET_CACHE_TTL_SECONDS = 900
+
 # DynamoDB table
-investigations_table = dynamodb.Table(INVESTIGATIONS_TABLE_NAME)
+@functools.lru_cache(maxsize=None)
+def investigations_table():
+    return dynamodb().Table(INVESTIGATIONS_TABLE_NAME)
+
+
+# Provisioned concurrency (the "live" alias) runs init ahead of traffic, so build
+# the clients here rather than on the first routed event
+if os.environ.get('AWS_LAMBDA_INITIALIZATION_TYPE') == 'provisioned-concurrency':
+    investigations_table()
+    sns_client()
+    secretsmanager_client()
 
 
 def handler(event, context):
@@ -37,94 +90,230 @@ def handler(event, context):
     Main handler for simple routing
     
     Args:
-        event: EventBridge event with investigation details
+        event: EventBridge event, or SQS event whose records wrap EventBridge events
         context: Lambda context
     
     Returns:
-        dict: Response with routing actions taken
+        dict: Response with routing actions taken per investigation; for SQS
+        events also batchItemFailures, so only the failed messages are retried
     """
     print(f"Simple routing triggered")
     print(f"Event: {json.dumps(event)}")
     
     try:
-        # Extract investigation from EventBridge event
-        detail = event.get('detail', {})
-        investigation_id = detail.get('investigation_id')
-        severity = detail.get('severity', 'MEDIUM')
-        client_name = detail.get('client_name', 'Unknown')
+        records, failed_message_ids = extract_records(event)
         
-        if not investigation_id:
-            raise ValueError("No investigation_id in event")
+        investigations = []
+        message_ids = {}
+        for message_id, detail in records:
+            investigation_id = detail.get('investigation_id')
+            severity = detail.get('severity', 'MEDIUM')
+            
+            if not investigation_id:
+                print(f"Skipping event without investigation_id: {json.dumps(detail, default=str)}")
+                continue
+            
+            if severity not in ROUTED_SEVERITIES:
+                print(f"Skipping {investigation_id}: severity {severity} is not routed")
+                continue
+            
+            investigations.append(detail)
+            message_ids.setdefault(investigation_id, []).append(message_id)
         
         # Store in DynamoDB
-        store_investigation(detail)
+        failed_ids = set(store_investigations(investigations))
+        
+        # Publish SNS alerts before paging or ticketing: an investigation whose alert
+        # fails is retried before anyone has been paged for it
+        alerts = [
+            detail for detail in investigations
+            if detail.get('severity') in ALERTED_SEVERITIES and detail['investigation_id'] not in failed_ids
+        ]
+        failed_ids.update(send_sns_alerts(alerts))
         
         # Route based on severity
-        actions_taken = []
+        results = []
         
-        if severity in ['CRITICAL', 'HIGH']:
-            # Page engineer
-            if PAGERDUTY_SECRET_NAME:
-                page_engineer(detail)
-                actions_taken.append('paged_engineer')
+        for detail in investigations:
+            if detail['investigation_id'] in failed_ids:
+                continue
             
-            # Also create ticket for tracking
-            if JIRA_SECRET_NAME:
-                create_jira_ticket(detail)
-                actions_taken.append('created_ticket')
+            try:
+                actions_taken = route_investigation(detail)
+            except Exception as e:
+                print(f"Error routing investigation {detail['investigation_id']}: {str(e)}")
+                failed_ids.add(detail['investigation_id'])
+                continue
             
-            # Send SNS alert
-            send_sns_alert(detail)
-            actions_taken.append('sent_alert')
-            
-        elif severity == 'MEDIUM':
-            # Just create ticket
-            if JIRA_SECRET_NAME:
-                create_jira_ticket(detail)
-                actions_taken.append('created_ticket')
+            results.append({
+                'investigation_id': detail['investigation_id'],
+                'actions': actions_taken
+            })
         
-        print(f"Routing complete for {investigation_id}: {actions_taken}")
+        failed_message_ids.extend(
+            message_id
+            for investigation_id in failed_ids
+            for message_id in message_ids[investigation_id]
+        )
         
-        return {
+        response = {
             'statusCode': 200,
             'body': json.dumps({
                 'message': 'Routing successful',
-                'investigation_id': investigation_id,
-                'actions': actions_taken
+                'results': results
             })
         }
         
+        if 'Records' in event:
+            # Partial batch response: only these messages return to the queue
+            response['batchItemFailures'] = [
+                {'itemIdentifier': message_id} for message_id in failed_message_ids
+            ]
+        elif failed_ids:
+            raise Exception(f"Failed to route investigations {sorted(failed_ids)}")
+        
+        return response
+        
     except Exception as e:
         print(f"Error in simple routing: {str(e)}")
         raise
 
 
-def store_investigation(investigation: Dict[str, Any]):
-    """Store investigation in DynamoDB"""
-    item = {
-        'investigation_id': investigation['investigation_id'],
-        'timestamp': investigation['timestamp'],
-        'client_account_id': investigation['client_account_id'],
-        'client_name': investigation['client_name'],
-        'severity': investigation['severity'],
-        'status': investigation['status'],
-        'summary': investigation['summary'],
-        'links': investigation['links'],
-        'tags': investigation.get('tags', {}),
-        'processed_at': datetime.utcnow().isoformat(),
-        'environment': ENVIRONMENT
-    }
+def route_investigation(detail: Dict[str, Any]) -> List[str]:
+    """Page and/or ticket one investigation based on severity; returns actions taken"""
+    severity = detail.get('severity', 'MEDIUM')
+    actions_taken = []
+    
+    if severity in ALERTED_SEVERITIES:
+        # Page engineer
+        if PAGERDUTY_SECRET_NAME:
+            page_engineer(detail)
+            actions_taken.append('paged_engineer')
+        
+        # Also create ticket for tracking
+        if JIRA_SECRET_NAME:
+            create_jira_ticket(detail)
+            actions_taken.append('created_ticket')
+        
+        # SNS alert already published by the handler
+        actions_taken.append('sent_alert')
+        
+    elif severity == 'MEDIUM':
+        # Just create ticket
+        if JIRA_SECRET_NAME:
+            create_jira_ticket(detail)
+            actions_taken.append('created_ticket')
+    
+    print(f"Routing complete for {detail['investigation_id']}: {actions_taken}")
+    return actions_taken
+
+
+def extract_records(event: Dict[str, Any]) -> Tuple[List[Tuple[Optional[str], Dict[str, Any]]], List[str]]:
+    """
+    Extract investigation details from an EventBridge event or a batch of SQS records
+    
+    Args:
+        event: EventBridge event, or SQS event whose records wrap EventBridge events
+    
+    Returns:
+        (SQS message ID or None, investigation detail) pairs, and the IDs of
+        SQS messages whose body couldn't be parsed
+    
+    Numbers with a fraction are parsed as Decimal, the type DynamoDB accepts.
+    """
+    if 'Records' not in event:
+        # Already parsed by the Lambda runtime - round-trip it to get Decimals
+        detail = json.loads(json.dumps(event.get('detail', {})), parse_float=Decimal)
+        return [(None, detail)], []
+    
+    records = []
+    malformed_message_ids = []
+    for record in event['Records']:
+        try:
+            detail = json.loads(record['body'], parse_float=Decimal).get('detail', {})
+            if not isinstance(detail, dict):
+                raise ValueError(f"detail is a {type(detail).__name__}, not an object")
+        except (ValueError, AttributeError) as e:
+            print(f"Could not parse SQS message {record['messageId']}: {str(e)}")
+            malformed_message_ids.append(record['messageId'])
+            continue
+        records.append((record['messageId'], detail))
+    
+    return records, malformed_message_ids
+
+
+def store_investigations(investigations: List[Dict[str, Any]]) -> List[str]:
+    """
+    Store investigations in DynamoDB (batch_writer groups puts into BatchWriteItem calls)
+    
+    Args:
+        investigations: Investigations to store
+    
+    Returns:
+        IDs of investigations missing fields required for the item, or holding
+        values DynamoDB can't store
+    """
+    if not investigations:
+        return []
+    
+    processed_at = datetime.utcnow().isoformat()
+    expires_at = int(time.time()) + INVESTIGATION_TTL_SECONDS
+    failed_ids = []
     
-    investigations_table.put_item(Item=item)
-    print(f"Stored investigation {investigation['investigation_id']} in DynamoDB")
+    # overwrite_by_pkeys drops duplicate keys within a batch (redelivered events)
+    with investigations_table().batch_writer(overwrite_by_pkeys=['investigation_id', 'timestamp']) as batch:
+        for investigation in investigations:
+            try:
+                item = {
+                    'investigation_id': investigation['investigation_id'],
+                    'timestamp': investigation['timestamp'],
+                    'client_account_id': investigation['client_account_id'],
+                    'client_name': investigation['client_name'],
+                    'severity': investigation['severity'],
+                    # Composite sort key for ClientSeverityIndex (per-client severity queries)
+                    'severity_ts': f"{investigation['severity']}#{investigation['timestamp']}",
+                    'status': investigation['status'],
+                    'summary': investigation['summary'],
+                    'links': investigation['links'],
+                    'tags': investigation.get('tags', {}),
+                    'processed_at': processed_at,
+                    'environment': ENVIRONMENT,
+                    'ttl': expires_at
+                }
+                ITEM_SERIALIZER.serialize(item)
+            except KeyError as e:
+                print(f"Investigation {investigation['investigation_id']} is missing {str(e)}, not stored")
+                failed_ids.append(investigation['investigation_id'])
+                continue
+            except (TypeError, ValueError, ArithmeticError) as e:
+                # ArithmeticError covers Decimals DynamoDB can't represent exactly
+                print(f"Investigation {investigation['investigation_id']} has an unstorable value ({str(e)}), not stored")
+                failed_ids.append(investigation['investigation_id'])
+                continue
+            batch.put_item(Item=item)
+    
+    print(f"Stored {len(investigations) - len(failed_ids)} investigations in DynamoDB")
+    return failed_ids
+
+
+def get_secret(secret_name: str) -> Dict[str, Any]:
+    """Get a JSON secret from Secrets Manager, cached for SECRET_CACHE_TTL_SECONDS"""
+    now = time.time()
+    cached = _SECRET_CACHE.get(secret_name)
+    if cached and now - cached[0] < SECRET_CACHE_TTL_SECONDS:
+        return cached[1]
+    
+    secret_value = secretsmanager_client().get_secret_value(SecretId=secret_name)
+    value = json.loads(secret_value['SecretString'])
+    _SECRET_CACHE[secret_name] = (now, value)
+    return value
 
 
 def page_engineer(investigation: Dict[str, Any]):
     """Page on-call engineer via PagerDuty"""
     try:
         # Get PagerDuty API key from Secrets Manager
-        secret_value = secretsmanager_client.get_secret_value(SecretId=PAGERDUTY_SECRET_NAME)
-        pagerduty_config = json.loads(secret_value['SecretString'])
+        pagerduty_config = get_secret(PAGERDUTY_SECRET_NAME)
         
         api_key = pagerduty_config['api_key']
         service_id = pagerduty_config['service_id']
@@ -146,8 +335,7 @@ def create_jira_ticket(investigation: Dict[str, Any]):
     """Create Jira ticket for investigation"""
     try:
         # Get Jira credentials from Secrets Manager
-        secret_value = secretsmanager_client.get_secret_value(SecretId=JIRA_SECRET_NAME)
-        jira_config = json.loads(secret_value['SecretString'])
+        jira_config = get_secret(JIRA_SECRET_NAME)
         
         api_token = jira_config['api_token']
         project_key = jira_config['project_key']
@@ -164,8 +352,8 @@ def create_jira_ticket(investigation: Dict[str, Any]):
         pass
 
 
-def send_sns_alert(investigation: Dict[str, Any]):
-    """Send SNS alert for critical investigations"""
+def format_sns_alert(investigation: Dict[str, Any]) -> Dict[str, str]:
+    """Build the SNS subject and message for a critical investigation"""
     subject = f"[{investigation['severity']}] Investigation Alert - {investigation['client_name']}"
     
     message = f"""
@@ -188,10 +376,46 @@ Links:
 Timestamp: {investigation['timestamp']}
 """
     
-    sns_client.publish(
-        TopicArn=ALERT_TOPIC_ARN,
-        Subject=subject,
-        Message=message
-    )
+    return {'Subject': subject, 'Message': message}
+
+
+def send_sns_alerts(investigations: List[Dict[str, Any]]) -> List[str]:
+    """
+    Send SNS alerts for critical investigations, up to 10 per PublishBatch call
+    
+    Args:
+        investigations: Investigations to alert on
+    
+    Returns:
+        IDs of investigations whose alert failed to publish
+    """
+    failed_ids = []
+    
+    # Format up front so one malformed investigation can't sink the whole batch
+    entries = []
+    for investigation in investigations:
+        try:
+            entries.append((investigation, format_sns_alert(investigation)))
+        except (KeyError, TypeError) as e:
+            print(f"Cannot format SNS alert for investigation {investigation['investigation_id']}: {type(e).__name__} {str(e)}")
+            failed_ids.append(investigation['investigation_id'])
+    
+    for i in range(0, len(entries), MAX_PUBLISH_BATCH_ENTRIES):
+        batch = [investigation for investigation, _ in entries[i:i + MAX_PUBLISH_BATCH_ENTRIES]]
+        response = sns_client().publish_batch(
+            TopicArn=ALERT_TOPIC_ARN,
+            PublishBatchRequestEntries=[
+                {'Id': str(j), **alert}
+                for j, (_, alert) in enumerate(entries[i:i + MAX_PUBLISH_BATCH_ENTRIES])
+            ]
+        )
+        
+        for entry in response.get('Successful', []):
+            print(f"Sent SNS alert for investigation {batch[int(entry['Id'])]['investigation_id']}")
+        
+        for entry in response.get('Failed', []):
+            investigation_id = batch[int(entry['Id'])]['investigation_id']
+            print(f"Failed to send SNS alert for investigation {investigation_id}: {entry.get('Code')} {entry.get('Message', '')}")
+            failed_ids.append(investigation_id)
     
-    print(f"Sent SNS alert for investigation {investigation['investigation_id']}")
+    return failed_ids
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Backfill GSI key attributes on existing investigation tracker items
+
+Items written before the GSI migration lack the derived attributes the new
+indexes are keyed on, so they are invisible to those indexes. This one-off
+script scans the table and sets the missing attributes:
+- severity_ts ("SEVERITY#timestamp") for ClientSeverityIndex
+- environment for EnvironmentTimeIndex
+
+Safe to re-run: attributes that are already set are left untouched.
+
+Usage:
+    python backfill_index_attributes.py --table investigation-tracker-dev --environment dev [--dry-run]
+"""
+
+import argparse
+import boto3
+
+
+def backfill(table_name: str, environment: str, dry_run: bool = False) -> int:
+    """Set missing index attributes on every item; returns the number of items updated"""
+    table = boto3.resource('dynamodb').Table(table_name)
+    scan_kwargs = {
+        'FilterExpression': 'attribute_not_exists(severity_ts) OR attribute_not_exists(environment)',
+        'ProjectionExpression': 'investigation_id, #ts, severity',
+        'ExpressionAttributeNames': {'#ts': 'timestamp'}
+    }
+
+    updated = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+
+        for item in response.get('Items', []):
+            severity_ts = f"{item.get('severity', 'MEDIUM')}#{item['timestamp']}"
+            print(f"{item['investigation_id']}: severity_ts={severity_ts} environment={environment}")
+
+            if not dry_run:
+                # if_not_exists keeps values the routing Lambda wrote since the scan read the item
+                table.update_item(
+                    Key={'investigation_id': item['investigation_id'], 'timestamp': item['timestamp']},
+                    UpdateExpression=(
+                        'SET severity_ts = if_not_exists(severity_ts, :severity_ts), '
+                        'environment = if_not_exists(environment, :environment)'
+                    ),
+                    ExpressionAttributeValues={':severity_ts': severity_ts, ':environment': environment}
+                )
+            updated += 1
+
+        if 'LastEvaluatedKey' not in response:
+            return updated
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--table', required=True, help='Investigation tracker table name')
+    parser.add_argument('--environment', required=True, help='Environment name the routing Lambda writes (e.g. dev)')
+    parser.add_argument('--dry-run', action='store_true', help='Print the updates without writing them')
+    args = parser.parse_args()
+
+    updated = backfill(args.table, args.environment, dry_run=args.dry_run)
+    print(f"{'Would update' if args.dry_run else 'Updated'} {updated} items")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Unit tests for the alert digester Lambda's partial batch responses
+"""
+
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+DIGESTER_PATH = Path(__file__).resolve().parents[2] / 'lambda' / 'alert_digester' / 'index.py'
+
+
+@pytest.fixture
+def digester(monkeypatch):
+    monkeypatch.setenv('ALERT_EMAIL', 'ops@example.com')
+    spec = importlib.util.spec_from_file_location('alert_digester_index', DIGESTER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeSes:
+    def __init__(self, error=None):
+        self.error = error
+        self.emails = []
+
+    def send_email(self, **kwargs):
+        if self.error:
+            raise self.error
+        self.emails.append(kwargs)
+
+
+def sqs_record(message_id, body):
+    return {'messageId': message_id, 'body': body}
+
+
+def alert_record(message_id, subject):
+    return sqs_record(message_id, json.dumps({'Subject': subject, 'Message': f'{subject} details'}))
+
+
+def failed_ids(response):
+    return [failure['itemIdentifier'] for failure in response['batchItemFailures']]
+
+
+def test_malformed_records_are_reported_individually(digester, monkeypatch):
+    ses = FakeSes()
+    monkeypatch.setattr(digester, 'ses_client', lambda: ses)
+
+    response = digester.handler({'Records': [
+        alert_record('m1', 'first'),
+        sqs_record('m2', 'not json'),
+        sqs_record('m3', '[1, 2]'),
+        alert_record('m4', 'second'),
+    ]}, None)
+
+    assert failed_ids(response) == ['m2', 'm3']
+    assert len(ses.emails) == 1
+    assert 'first details' in ses.emails[0]['Message']['Body']['Text']['Data']
+    assert 'second details' in ses.emails[0]['Message']['Body']['Text']['Data']
+
+
+def test_send_failure_reports_every_digested_record(digester, monkeypatch):
+    monkeypatch.setattr(digester, 'ses_client', lambda: FakeSes(RuntimeError('Email address is not verified')))
+
+    response = digester.handler({'Records': [
+        alert_record('m1', 'first'),
+        sqs_record('m2', 'not json'),
+        alert_record('m3', 'second'),
+    ]}, None)
+
+    assert sorted(failed_ids(response)) == ['m1', 'm2', 'm3']
+    assert json.loads(response['body'])['alert_count'] == 0
+
+
+def test_clean_batch_has_no_failures(digester, monkeypatch):
+    ses = FakeSes()
+    monkeypatch.setattr(digester, 'ses_client', lambda: ses)
+
+    response = digester.handler({'Records': [alert_record('m1', 'only')]}, None)
+
+    assert response['batchItemFailures'] == []
+    assert ses.emails[0]['Message']['Subject']['Data'] == 'only'
@@ -0,0 +1,249 @@
+"""
+Unit tests for the investigation monitor Lambda's text processing
+
+The Lambda module reads its configuration from the environment at import time,
+so it is loaded per test through the monitor fixture rather than imported.
+"""
+
+import base64
+import gzip
+import importlib.util
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+MONITOR_PATH = Path(__file__).resolve().parents[2] / 'lambda' / 'investigation_monitor' / 'index.py'
+
+MONITOR_ENV = {
+    'CLIENT_NAME': 'Acme',
+    'CLIENT_ACCOUNT_ID': '123456789012',
+    'OUTBOX_QUEUE_URL': 'https://sqs.us-east-1.amazonaws.com/123456789012/outbox',
+    'STATE_PARAMETER_NAME': '/investigation-monitor/acme/last-processed-investigation',
+    'AWS_REGION': 'us-east-1',
+}
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    """Import a fresh copy of the monitor Lambda module"""
+    for name, value in MONITOR_ENV.items():
+        monkeypatch.setenv(name, value)
+
+    spec = importlib.util.spec_from_file_location('investigation_monitor_index', MONITOR_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def reference_category(root_cause: str) -> str:
+    """Original if/elif substring categorization the fused pattern must agree with"""
+    root_cause_lower = root_cause.lower()
+    if any(keyword in root_cause_lower for keyword in ['connection', 'timeout', 'network']):
+        return 'network_connectivity'
+    elif any(keyword in root_cause_lower for keyword in ['memory', 'cpu', 'disk', 'capacity']):
+        return 'resource_exhaustion'
+    elif any(keyword in root_cause_lower for keyword in ['permission', 'access', 'denied', 'unauthorized']):
+        return 'permissions_issue'
+    elif any(keyword in root_cause_lower for keyword in ['deployment', 'version', 'rollout']):
+        return 'deployment_issue'
+    elif any(keyword in root_cause_lower for keyword in ['dependency', 'service', 'downstream']):
+        return 'dependency_failure'
+    else:
+        return 'unknown'
+
+
+@pytest.mark.parametrize('root_cause, expected', [
+    ('Connection TIMEOUT to RDS', 'network_connectivity'),
+    ('Out of memory; access denied', 'resource_exhaustion'),
+    ('Bad rollout of new version', 'deployment_issue'),
+    ('Downstream service failed', 'dependency_failure'),
+    ('nothing to see here', 'unknown'),
+    ('', 'unknown'),
+    # Overlapping keywords: "version" + "network" share the "n"
+    ('versionetwork', 'network_connectivity'),
+    # Unicode case variants that a case-insensitive pattern matches but .lower() doesn't map
+    ('ſervice down', 'unknown'),
+    ('ıam denıed', 'unknown'),
+    ('NETWOR\u212a outage', 'network_connectivity'),  # Kelvin sign lowercases to 'k'
+])
+def test_categorize_root_cause(monitor, root_cause, expected):
+    assert monitor.categorize_root_cause(root_cause) == expected
+    assert reference_category(root_cause) == expected
+
+
+def test_categorize_root_cause_matches_reference(monitor):
+    keywords = list(monitor.CATEGORY_BY_KEYWORD)
+    alphabet = 'aeiknorstvſıİK \n'
+    rng = random.Random(1234)
+
+    def random_part():
+        if rng.random() < 0.5:
+            return ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 6)))
+        keyword = rng.choice(keywords)
+        return keyword.upper() if rng.random() < 0.3 else keyword
+
+    for _ in range(5000):
+        root_cause = ''.join(random_part() for _ in range(rng.randint(0, 4)))
+        assert monitor.categorize_root_cause(root_cause) == reference_category(root_cause), root_cause
+
+
+def test_format_event_survives_unicode_root_cause(monitor):
+    event, body = monitor.format_investigation_event({
+        'investigation_id': 'inv-1',
+        'root_cause': 'ſervice down, ıam denıed',
+        'completed_at': '2024-01-01T00:00:00',
+    })
+
+    assert event['summary']['root_cause_category'] == 'unknown'
+    assert '"inv-1"' in body
+
+
+# Expected redactions
+REDACTION_CASES = [
+    ('db at 10.0.0.12 unreachable', 'db at REDACTED_IP unreachable'),
+    ('mail ops@example.com now', 'mail REDACTED_EMAIL now'),
+    ('api_key=abc123 rejected', 'api_key: REDACTED rejected'),
+    ('Password:  hunter2 x', 'Password: REDACTED x'),
+    ('token = t0k3n', 'token: REDACTED'),
+    ('apiKey=abc123 rejected', 'apiKey: REDACTED rejected'),
+    ('authToken: xyz', 'authToken: REDACTED'),
+    ('clientSecret=s3cr3t', 'clientSecret: REDACTED'),
+    ('accessToken=eyJhbGciOiJIUzI1NiJ9.e30.sig', 'accessToken: REDACTED'),
+    ('db_password: hunter2', 'db_password: REDACTED'),
+    ('keystore=2', 'keystore=2'),
+    # Separator-only values are still redacted (the value takes back a separator)
+    ('password=:', 'password: REDACTED'),
+    ('secret :=', 'secret: REDACTED'),
+    ('key= ', 'key= '),
+    # Non-ASCII whitespace still separates a secret from its value
+    ('password\xa0hunter2', 'password: REDACTED'),
+    ('token:\u2003abc', 'token: REDACTED'),
+]
+
+
+@pytest.mark.parametrize('text, expected', REDACTION_CASES)
+def test_redact_sensitive_data(monitor, text, expected):
+    assert monitor.redact_sensitive_data(text) == expected
+
+
+def test_redaction_is_linear_on_long_values(monitor):
+    # Long unbroken values and separator runs must not trigger backtracking blowups
+    text = ('password=' + 'x' * 5000 + ' ') * 20 + 'token' + ':' * 5000
+    redacted = monitor.redact_sensitive_data(text)
+    assert 'x' * 10 not in redacted
+
+
+class FakeSsm:
+    class exceptions:
+        class ParameterNotFound(Exception):
+            pass
+
+    def __init__(self, value=None):
+        self.value = value
+
+    def get_parameter(self, Name):
+        if self.value is None:
+            raise self.exceptions.ParameterNotFound()
+        return {'Parameter': {'Value': self.value}}
+
+    def put_parameter(self, Name, Value, **kwargs):
+        self.value = Value
+
+
+class FakeSqs:
+    """Accepts every entry except those whose body mentions a failing investigation"""
+
+    def __init__(self, transient=(), sender_fault=()):
+        self.transient = set(transient)
+        self.sender_fault = set(sender_fault)
+        self.sent = []
+
+    def send_message_batch(self, QueueUrl, Entries):
+        response = {'Successful': [], 'Failed': []}
+        for entry in Entries:
+            investigation_id = json.loads(entry['MessageBody'])['investigation_id']
+            if investigation_id in self.transient:
+                response['Failed'].append({'Id': entry['Id'], 'SenderFault': False, 'Code': 'InternalError'})
+            elif investigation_id in self.sender_fault:
+                response['Failed'].append({'Id': entry['Id'], 'SenderFault': True, 'Code': 'InvalidMessageContents'})
+            else:
+                self.sent.append(investigation_id)
+                response['Successful'].append({'Id': entry['Id']})
+        return response
+
+
+def subscription_event(*investigations):
+    """CloudWatch Logs subscription payload with one log event per (timestamp_ms, fields) pair"""
+    payload = {'logEvents': [
+        {'timestamp': timestamp, 'message': json.dumps({'status': 'COMPLETED', **fields})}
+        for timestamp, fields in investigations
+    ]}
+    return {'awslogs': {'data': base64.b64encode(gzip.compress(json.dumps(payload).encode())).decode()}}
+
+
+@pytest.fixture
+def clients(monitor, monkeypatch):
+    ssm, sqs = FakeSsm(), FakeSqs()
+    monkeypatch.setattr(monitor, 'ssm_client', lambda: ssm)
+    monkeypatch.setattr(monitor, 'sqs_client', lambda: sqs)
+    monkeypatch.setattr(monitor, 'RETRY_BASE_DELAY_SECONDS', 0)
+    return ssm, sqs
+
+
+def test_unformattable_investigation_does_not_pin_watermark(monitor, clients, monkeypatch):
+    ssm, sqs = clients
+    sqs.sender_fault.add('inv-rejected')
+    real_format = monitor.format_investigation_event
+
+    def format_or_fail(investigation):
+        if investigation['investigation_id'] == 'inv-broken':
+            raise TypeError('bad investigation')
+        return real_format(investigation)
+
+    monkeypatch.setattr(monitor, 'format_investigation_event', format_or_fail)
+
+    monitor.handler(subscription_event(
+        (1_700_000_000_000, {'investigation_id': 'inv-broken'}),
+        (1_700_000_001_000, {'investigation_id': 'inv-null', 'root_cause': None, 'affected_resources': None}),
+        (1_700_000_002_000, {'investigation_id': 'inv-rejected'}),
+        (1_700_000_003_000, {'investigation_id': 'inv-ok'}),
+    ), None)
+
+    assert sqs.sent == ['inv-null', 'inv-ok']
+    assert ssm.value == '2023-11-14T22:13:23'
+
+
+def test_push_with_unsent_events_holds_watermark_and_fails(monitor, clients):
+    ssm, sqs = clients
+    sqs.transient.add('inv-2')
+
+    with pytest.raises(RuntimeError):
+        monitor.handler(subscription_event(
+            (1_700_000_001_000, {'investigation_id': 'inv-1'}),
+            (1_700_000_002_000, {'investigation_id': 'inv-2'}),
+            (1_700_000_003_000, {'investigation_id': 'inv-3'}),
+        ), None)
+
+    assert sqs.sent == ['inv-1', 'inv-3']
+    assert ssm.value == '2023-11-14T22:13:21'
+
+
+def test_reconciliation_starts_just_past_the_watermark(monitor, clients, monkeypatch):
+    ssm, _ = clients
+    ssm.value = '2023-11-14T22:13:21.123000'
+    calls = []
+
+    class FakeLogs:
+        def get_paginator(self, name):
+            return self
+
+        def paginate(self, **kwargs):
+            calls.append(kwargs)
+            return []
+
+    monkeypatch.setattr(monitor, 'logs_client', lambda: FakeLogs())
+    monitor.handler({}, None)
+
+    assert calls[0]['startTime'] == 1_700_000_001_124
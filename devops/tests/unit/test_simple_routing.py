@@ -0,0 +1,161 @@
+"""
+Unit tests for the simple routing Lambda's per-investigation failure handling
+
+AWS calls go through real boto3 clients with botocore's Stubber, so DynamoDB
+item serialization runs exactly as it does in Lambda.
+"""
+
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+from botocore.stub import ANY, Stubber
+
+ROUTING_PATH = Path(__file__).resolve().parents[2] / 'lambda' / 'simple_routing' / 'index.py'
+
+TABLE_NAME = 'investigation-tracker-test'
+
+ROUTING_ENV = {
+    'INVESTIGATIONS_TABLE': TABLE_NAME,
+    'ALERT_TOPIC_ARN': 'arn:aws:sns:us-east-1:123456789012:investigation-critical-alerts-test',
+    'ENVIRONMENT': 'test',
+    'AWS_DEFAULT_REGION': 'us-east-1',
+    'AWS_ACCESS_KEY_ID': 'testing',
+    'AWS_SECRET_ACCESS_KEY': 'testing',
+}
+
+
+@pytest.fixture
+def routing(monkeypatch):
+    """Import a fresh copy of the routing Lambda module (and fresh cached clients)"""
+    for name, value in ROUTING_ENV.items():
+        monkeypatch.setenv(name, value)
+    for name in ('PAGERDUTY_API_KEY_SECRET', 'JIRA_API_KEY_SECRET', 'AWS_LAMBDA_INITIALIZATION_TYPE'):
+        monkeypatch.delenv(name, raising=False)
+
+    spec = importlib.util.spec_from_file_location('simple_routing_index', ROUTING_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def dynamodb_stub(routing):
+    with Stubber(routing.investigations_table().meta.client) as stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+@pytest.fixture
+def sns_stub(routing):
+    with Stubber(routing.sns_client()) as stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+def investigation(investigation_id, severity='CRITICAL', **summary):
+    return {
+        'investigation_id': investigation_id,
+        'timestamp': '2024-01-01T00:00:00',
+        'client_account_id': '123456789012',
+        'client_name': 'Acme',
+        'severity': severity,
+        'status': 'ROOT_CAUSE_FOUND',
+        'summary': {
+            'root_cause_brief': 'Connection timeout',
+            'resource_types': ['RDS'],
+            'duration_minutes': 12,
+            **summary,
+        },
+        'links': {
+            'devops_agent_investigation': 'https://example.com/inv',
+            'cloudwatch_logs': 'https://example.com/logs',
+        },
+    }
+
+
+def sqs_record(message_id, detail):
+    return {'messageId': message_id, 'body': json.dumps({'detail': detail})}
+
+
+def expect_batch_write(stubber, item_count):
+    stubber.add_response(
+        'batch_write_item',
+        {'UnprocessedItems': {}},
+        {'RequestItems': {TABLE_NAME: [{'PutRequest': {'Item': ANY}}] * item_count}},
+    )
+
+
+def expect_publish_batch(stubber, failed_entry_ids=()):
+    stubber.add_response('publish_batch', {
+        'Successful': [],
+        'Failed': [
+            {'Id': entry_id, 'Code': 'InternalError', 'SenderFault': False}
+            for entry_id in failed_entry_ids
+        ],
+    })
+
+
+def failed_message_ids(response):
+    return sorted(failure['itemIdentifier'] for failure in response['batchItemFailures'])
+
+
+def test_store_investigations_fails_only_unstorable_items(routing, dynamodb_stub):
+    expect_batch_write(dynamodb_stub, 2)
+
+    failed_ids = routing.store_investigations([
+        investigation('inv-1'),
+        investigation('inv-float', duration_minutes=12.5),
+        investigation('inv-2'),
+        {key: value for key, value in investigation('inv-partial').items() if key != 'links'},
+    ])
+
+    assert failed_ids == ['inv-float', 'inv-partial']
+
+
+def test_send_sns_alerts_returns_failed_and_unformattable_ids(routing, sns_stub):
+    expect_publish_batch(sns_stub, failed_entry_ids=['1'])
+
+    failed_ids = routing.send_sns_alerts([
+        investigation('inv-1'),
+        investigation('inv-2'),
+        {key: value for key, value in investigation('inv-partial').items() if key != 'summary'},
+    ])
+
+    assert sorted(failed_ids) == ['inv-2', 'inv-partial']
+
+
+def test_handler_reports_only_failed_messages(routing, dynamodb_stub, sns_stub):
+    # m1's fractional duration is parsed as a Decimal and stored with the rest
+    expect_batch_write(dynamodb_stub, 3)
+    expect_publish_batch(sns_stub, failed_entry_ids=['1'])
+
+    response = routing.handler({'Records': [
+        sqs_record('m1', investigation('inv-1', duration_minutes=12.5)),
+        {'messageId': 'm2', 'body': 'not json'},
+        sqs_record('m3', investigation('inv-3', severity='HIGH')),
+        sqs_record('m4', investigation('inv-4', severity='MEDIUM')),
+        sqs_record('m5', investigation('inv-5', severity='LOW')),
+        {'messageId': 'm6', 'body': json.dumps({'detail': 'inv-6'})},
+    ]}, None)
+
+    assert failed_message_ids(response) == ['m2', 'm3', 'm6']
+    routed = [result['investigation_id'] for result in json.loads(response['body'])['results']]
+    assert routed == ['inv-1', 'inv-4']
+
+
+def test_handler_accepts_fractional_numbers_in_eventbridge_events(routing, dynamodb_stub, sns_stub):
+    expect_batch_write(dynamodb_stub, 1)
+    expect_publish_batch(sns_stub)
+
+    response = routing.handler({'detail': investigation('inv-1', duration_minutes=12.5)}, None)
+
+    assert 'batchItemFailures' not in response
+
+
+def test_handler_raises_for_failed_eventbridge_event(routing, dynamodb_stub):
+    with pytest.raises(Exception, match='inv-partial'):
+        routing.handler({'detail': {
+            key: value for key, value in investigation('inv-partial', severity='MEDIUM').items() if key != 'links'
+        }}, None)